@@ -0,0 +1,70 @@
+"""
+Compare the memory held by queued spotdl Songs and compact Track records.
+
+Run from the repository root with the bot's environment configured:
+
+    python benchmarks/track_memory.py [count]
+"""
+
+import sys
+import tracemalloc
+
+from spotdl import Song
+
+from delta.utils.spotify import Track
+
+
+def make_song(i: int) -> Song:
+    return Song(
+        name=f"Song {i} with a name",
+        artists=[f"Artist {i}", "Featured Artist"],
+        artist=f"Artist {i}",
+        genres=["pop", "indie pop", "dance"],
+        disc_number=1,
+        disc_count=1,
+        album_name=f"Album {i} (Deluxe)",
+        album_artist=f"Artist {i}",
+        duration=215,
+        year=2021,
+        date="2021-01-01",
+        track_number=3,
+        tracks_count=12,
+        song_id=f"{i:022d}",
+        explicit=False,
+        publisher="Some Records",
+        url=f"https://open.spotify.com/track/{i:022d}",
+        isrc=f"USRC1{i:07d}",
+        cover_url=f"https://i.scdn.co/image/ab67616d0000b273{i:024d}",
+        copyright_text="2021 Some Records",
+        popularity=55,
+        album_id=f"{i:021d}a",
+        list_name="Playlist",
+        list_url="https://open.spotify.com/playlist/x",
+        list_position=i,
+        list_length=1000,
+        artist_id=f"{i:021d}b",
+        album_type="album",
+    )
+
+
+def measure(build) -> int:
+    tracemalloc.start()
+    objects = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return size
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    songs = measure(lambda: [make_song(i) for i in range(count)])
+    # Each song is dropped right after conversion, like in spotdl_cmd
+    tracks = measure(lambda: [Track.from_song(make_song(i)) for i in range(count)])
+    print(f"{count} Song objects:  {songs / 1024:.1f} KiB")
+    print(f"{count} Track records: {tracks / 1024:.1f} KiB")
+    print(f"Track / Song: {tracks / songs:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,12 @@ class Settings:
         self.channel_log: Optional[int] = self._get_env_var(
             "CHANNEL_LOG", int, optional=True
         )
+        self.channel_logs: List[int] = self._parse_id_list(
+            self._get_env_var("CHANNEL_LOGS", str, default="")
+        ) or ([self.channel_log] if self.channel_log else [])
+        self.helper_bot_tokens: List[str] = self._parse_str_list(
+            self._get_env_var("HELPER_BOT_TOKENS", str, default="")
+        )
         self.download_path: str = self._get_env_var(
             "DOWNLOAD_PATH", str, default="downloads"
         )
@@ -35,7 +41,130 @@ class Settings:
         self.spotify_secret: Optional[str] = self._get_env_var(
             "SPOTIFY_SECRET", str, optional=True, default=""
         )
-        # Note: gemini_api_key is now a property so we don't assign it here directly.
+        self.download_error_history: int = self._get_env_var(
+            "DOWNLOAD_ERROR_HISTORY", int, default=100
+        )
+        self.download_archive: bool = self._parse_bool(
+            self._get_env_var("DOWNLOAD_ARCHIVE", str, default="false")
+        )
+        self.user_first_delivery: bool = self._parse_bool(
+            self._get_env_var("USER_FIRST_DELIVERY", str, default="false")
+        )
+        self.callback_token_ttl: int = self._get_env_var(
+            "CALLBACK_TOKEN_TTL", int, default=3600
+        )
+        self.callback_token_max: int = self._get_env_var(
+            "CALLBACK_TOKEN_MAX", int, default=5000
+        )
+        self.callback_token_persist: bool = self._parse_bool(
+            self._get_env_var("CALLBACK_TOKEN_PERSIST", str, default="false")
+        )
+        self.prefetch_enabled: bool = self._parse_bool(
+            self._get_env_var("PREFETCH_ENABLED", str, default="false")
+        )
+        self.prefetch_dwell: float = self._get_env_var(
+            "PREFETCH_DWELL", float, default=1.5
+        )
+        self.prefetch_max_active: int = self._get_env_var(
+            "PREFETCH_MAX_ACTIVE", int, default=2
+        )
+        self.prefetch_hourly_budget: int = self._get_env_var(
+            "PREFETCH_HOURLY_BUDGET", int, default=30
+        )
+        self.maintenance_window: str = self._get_env_var(
+            "MAINTENANCE_WINDOW", str, default=""
+        )
+        self.maintenance_interval: int = self._get_env_var(
+            "MAINTENANCE_INTERVAL", int, default=900
+        )
+        self.maintenance_batch: int = self._get_env_var(
+            "MAINTENANCE_BATCH", int, default=50
+        )
+        self.maintenance_stale_days: int = self._get_env_var(
+            "MAINTENANCE_STALE_DAYS", int, default=7
+        )
+        self.in_memory_upload: bool = self._parse_bool(
+            self._get_env_var("IN_MEMORY_UPLOAD", str, default="false")
+        )
+        self.in_memory_max_file: int = self._get_env_var(
+            "IN_MEMORY_MAX_FILE", int, default=20 * 1024 * 1024
+        )
+        self.in_memory_budget: int = self._get_env_var(
+            "IN_MEMORY_BUDGET", int, default=200 * 1024 * 1024
+        )
+        self.spotify_rate: float = self._get_env_var("SPOTIFY_RATE", float, default=5.0)
+        self.spotify_burst: int = self._get_env_var("SPOTIFY_BURST", int, default=10)
+        self.spotify_max_retries: int = self._get_env_var(
+            "SPOTIFY_MAX_RETRIES", int, default=3
+        )
+        self.download_workers: int = self._get_env_var(
+            "DOWNLOAD_WORKERS", int, default=6
+        )
+        self.metadata_workers: int = self._get_env_var(
+            "METADATA_WORKERS", int, default=8
+        )
+        self.image_workers: int = self._get_env_var("IMAGE_WORKERS", int, default=2)
+        self.misc_workers: int = self._get_env_var("MISC_WORKERS", int, default=4)
+        self.gemini_max_chats: int = self._get_env_var(
+            "GEMINI_MAX_CHATS", int, default=200
+        )
+        self.gemini_chat_idle: int = self._get_env_var(
+            "GEMINI_CHAT_IDLE", int, default=3600
+        )
+        self.gemini_memory_cap: int = self._get_env_var(
+            "GEMINI_MEMORY_CAP", int, default=8 * 1024 * 1024
+        )
+        self.gemini_stream: bool = self._parse_bool(
+            self._get_env_var("GEMINI_STREAM", str, default="false")
+        )
+        self.gemini_stream_interval: float = self._get_env_var(
+            "GEMINI_STREAM_INTERVAL", float, default=1.5
+        )
+        self.gemini_cache_size: int = self._get_env_var(
+            "GEMINI_CACHE_SIZE", int, default=256
+        )
+        self.gemini_cache_ttl: int = self._get_env_var(
+            "GEMINI_CACHE_TTL", int, default=1800
+        )
+        self.gemini_image_size: int = self._get_env_var(
+            "GEMINI_IMAGE_SIZE", int, default=1024
+        )
+        self.gemini_history_tokens: int = self._get_env_var(
+            "GEMINI_HISTORY_TOKENS", int, default=8000
+        )
+        self.gemini_summarize: bool = self._parse_bool(
+            self._get_env_var("GEMINI_SUMMARIZE", str, default="true")
+        )
+        self.gemini_max_concurrent: int = self._get_env_var(
+            "GEMINI_MAX_CONCURRENT", int, default=8
+        )
+        self.gemini_max_waiting: int = self._get_env_var(
+            "GEMINI_MAX_WAITING", int, default=32
+        )
+        self.gemini_max_per_user: int = self._get_env_var(
+            "GEMINI_MAX_PER_USER", int, default=3
+        )
+        self.gemini_max_wait: float = self._get_env_var(
+            "GEMINI_MAX_WAIT", float, default=30.0
+        )
+        self.gemini_model: str = self._get_env_var(
+            "GEMINI_MODEL", str, default="gemini-2.0-flash"
+        )
+        self.gemini_light_model: str = self._get_env_var(
+            "GEMINI_LIGHT_MODEL", str, default="gemini-2.0-flash-lite"
+        )
+        self.gemini_routing: bool = self._parse_bool(
+            self._get_env_var("GEMINI_ROUTING", str, default="true")
+        )
+        self.eval_timeout: float = self._get_env_var(
+            "EVAL_TIMEOUT", float, default=60.0
+        )
+        self.eval_memory_limit: int = self._get_env_var(
+            "EVAL_MEMORY_LIMIT", int, default=512
+        )
+        self.gemini_api_keys: List[str] = self._parse_str_list(
+            self._get_env_var("GEMINI_API_KEY", str, default="")
+        )
 
     def _get_env_var(
         self,
@@ -73,7 +202,7 @@ class Settings:
 
     def _parse_id_list(self, value: Union[int, str, List[int]]) -> List[int]:
         """
-        Validate and parse owner_id and devs_id fields, ensuring they are lists of integers.
+        Validate and parse ID list fields, ensuring they are lists of integers.
 
         Args:
             value: Input value to validate
@@ -88,13 +217,16 @@ class Settings:
             return [value]
         if isinstance(value, str):
             value = value.strip()
-            if value.isdigit():
+            if not value:
+                return []
+            if value.lstrip("-").isdigit():
                 return [int(value)]
             # Convert comma-separated string to list of integers
             id_list = []
             for item in value.split(","):
                 item = item.strip()
-                if item.isdigit():
+                # Chat IDs of channels are negative
+                if item.lstrip("-").isdigit():
                     id_list.append(int(item))
                 else:
                     raise ValueError(f"Invalid integer value in list: '{item}'")
@@ -104,20 +236,51 @@ class Settings:
                 return value
             raise ValueError("All items in the list must be integers.")
         raise ValueError(
-            "owner_id and devs_id must be an int, comma-separated string, or list of integers."
+            "ID lists must be an int, comma-separated string, or list of integers."
         )
 
+    def _parse_str_list(self, value: str) -> List[str]:
+        """
+        Split a comma-separated string into a list of non-empty, stripped items.
+
+        Args:
+            value: Comma-separated string
+
+        Returns:
+            List of items
+        """
+        return [item.strip() for item in value.split(",") if item.strip()]
+
+    def _parse_bool(self, value: Union[bool, str]) -> bool:
+        """
+        Parse a boolean flag such as "true", "1", "yes" or "on".
+
+        Args:
+            value: Input value to parse
+
+        Returns:
+            Parsed boolean value
+
+        Raises:
+            ValueError: If the value is not a recognised boolean
+        """
+        if isinstance(value, bool):
+            return value
+        value = value.strip().lower()
+        if value in ("1", "true", "yes", "on"):
+            return True
+        if value in ("0", "false", "no", "off", ""):
+            return False
+        raise ValueError(f"Invalid boolean value: '{value}'")
+
     @property
     def gemini_api_key(self) -> str:
         """
         Return a random API key from the comma-separated list in the GEMINI_API_KEY environment variable.
         """
-        keys = os.getenv("GEMINI_API_KEY", "")
-        # Split by comma, remove any extra whitespace and filter out empty strings.
-        keys_list = [key.strip() for key in keys.split(",") if key.strip()]
-        if not keys_list:
+        if not self.gemini_api_keys:
             return ""
-        return random.choice(keys_list)
+        return random.choice(self.gemini_api_keys)
 
 
 # Load environment file if it exists
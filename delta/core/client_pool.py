@@ -0,0 +1,113 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from pyrogram import Client
+from pyrogram.types import Message
+
+from delta import config
+
+logger = logging.getLogger("DeltaX")
+
+
+class ClientPool:
+    """
+    Pool of Pyrogram clients and log channels used for uploads.
+
+    The main bot is always part of the pool, helper bots from
+    ``config.helper_bot_tokens`` are added on start. Every client must be an
+    admin of every channel in ``config.channel_logs``. Each upload goes to the
+    least busy client and channel so the per-bot and per-chat flood limits
+    apply to a share of the traffic only.
+    """
+
+    def __init__(self):
+        self.main: Optional[Client] = None
+        self.clients: List[Client] = []
+        self.channels: List[int] = list(config.channel_logs)
+        self._client_load: Dict[int, int] = {}
+        self._channel_load: Dict[int, int] = {}
+        self._helpers: List[Client] = []
+
+    async def start(self, main: Client) -> None:
+        self.main = main
+        self._helpers = []
+        for index, token in enumerate(config.helper_bot_tokens):
+            helper = Client(
+                f"helper{index}",
+                api_id=config.api_id,
+                api_hash=config.api_hash,
+                bot_token=token,
+                in_memory=True,
+                no_updates=True,
+            )
+            try:
+                await helper.start()
+            except Exception as e:
+                logger.error(f"Failed to start helper bot #{index}: {e}")
+                continue
+            self._helpers.append(helper)
+        self.clients = [main] + self._helpers
+        self._client_load = {id(client): 0 for client in self.clients}
+        self._channel_load = {channel: 0 for channel in self.channels}
+        logger.info(
+            "Upload pool ready with %d client(s) and %d channel(s)",
+            len(self.clients),
+            len(self.channels),
+        )
+
+    async def stop(self) -> None:
+        for helper in self._helpers:
+            try:
+                await helper.stop()
+            except Exception as e:
+                logger.error(f"Failed to stop helper bot: {e}")
+        self._helpers = []
+        self.clients = [self.main] if self.main else []
+
+    def next_channel(self) -> int:
+        """
+        Return the least busy log channel.
+        """
+        if not self.channels:
+            raise ValueError("No log channel configured")
+        return min(self.channels, key=lambda channel: self._channel_load[channel])
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Tuple[Client, int]]:
+        """
+        Reserve the least busy client and log channel for one upload.
+
+        Yields:
+            Tuple of the client and the channel to upload to
+        """
+        if not self.clients:
+            raise RuntimeError("Upload pool is not started")
+        client = min(self.clients, key=lambda c: self._client_load[id(c)])
+        channel = self.next_channel()
+        self._client_load[id(client)] += 1
+        self._channel_load[channel] += 1
+        try:
+            yield client, channel
+        finally:
+            self._client_load[id(client)] -= 1
+            self._channel_load[channel] -= 1
+
+    async def send_audio(self, **kwargs) -> Tuple[Client, Message]:
+        """
+        Upload an audio file to a log channel with the least busy client.
+
+        Args:
+            **kwargs: Arguments passed to ``Client.send_audio`` except chat_id
+
+        Returns:
+            Tuple of the client that uploaded and the sent message
+        """
+        async with self.acquire() as (client, channel):
+            return client, await client.send_audio(chat_id=channel, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.clients)
+
+
+upload_pool = ClientPool()
@@ -1,7 +1,12 @@
-__all__ = ["Chat", "Music", "init_db", "Repository"]
+__all__ = ["Chat", "Music", "ArchivedUrl", "PlaylistSubscription", "CallbackToken", "TrackStat", "ChatHistory", "init_db", "Repository"]
 
 
 from .repository import Repository
 from .models import Chat
 from .music_db import Music
+from .archive_db import ArchivedUrl
+from .playlist_db import PlaylistSubscription
+from .token_db import CallbackToken
+from .stats_db import TrackStat
+from .gemini_db import ChatHistory
 from .database_provider import init_db
\ No newline at end of file
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Iterable, Set
+
+from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .database_provider import Base, async_session
+
+
+class ArchivedUrl(Base):
+    __tablename__ = "download_archive"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    url = Column(String, nullable=False, unique=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+async def add_archive_urls(urls: Iterable[str]) -> None:
+    rows = [{"url": url} for url in set(urls)]
+    if not rows:
+        return
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                insert(ArchivedUrl)
+                .values(rows)
+                .on_conflict_do_nothing(index_elements=[ArchivedUrl.url])
+            )
+
+
+async def get_all_archived_urls() -> Set[str]:
+    async with async_session() as session:
+        result = await session.execute(select(ArchivedUrl.url))
+        return set(result.scalars().all())
+
+
+async def get_archived_urls(urls: Iterable[str]) -> Set[str]:
+    urls = list(set(urls))
+    archived: Set[str] = set()
+    async with async_session() as session:
+        # Keep the IN list well below the bind parameter limit
+        for start in range(0, len(urls), 1000):
+            result = await session.execute(
+                select(ArchivedUrl.url).where(
+                    ArchivedUrl.url.in_(urls[start : start + 1000])
+                )
+            )
+            archived.update(result.scalars().all())
+    return archived
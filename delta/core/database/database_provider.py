@@ -1,3 +1,4 @@
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -11,6 +12,20 @@ engine = create_async_engine(config.database_uri, echo=True)
 async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
+# Columns added to existing tables, create_all only creates missing tables
+MIGRATIONS = [
+    "ALTER TABLE musics ADD COLUMN IF NOT EXISTS chat_id BIGINT",
+    "ALTER TABLE gemini_histories ADD COLUMN IF NOT EXISTS summary TEXT",
+    # Keep the newest of duplicated subscriptions before making them unique
+    "DELETE FROM playlist_subscriptions a USING playlist_subscriptions b "
+    "WHERE a.chat_id = b.chat_id AND a.playlist_id = b.playlist_id AND a.id < b.id",
+    "CREATE UNIQUE INDEX IF NOT EXISTS uq_playlist_subscriptions_chat_playlist "
+    "ON playlist_subscriptions (chat_id, playlist_id)",
+]
+
+
 async def init_db():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for statement in MIGRATIONS:
+            await conn.execute(text(statement))
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Text, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .database_provider import Base, async_session
+
+
+class ChatHistory(Base):
+    __tablename__ = "gemini_histories"
+    user_id = Column(BigInteger, primary_key=True)
+    instruction = Column(Text, nullable=True)
+    history = Column(JSON, nullable=False, default=list)
+    summary = Column(Text, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+async def get_chat_history(user_id: int) -> Optional[ChatHistory]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(ChatHistory).where(ChatHistory.user_id == user_id)
+        )
+        return result.scalars().first()
+
+
+async def save_chat_history(
+    user_id: int,
+    history: List[Any],
+    instruction: Optional[str] = None,
+    summary: Optional[str] = None,
+) -> None:
+    now = datetime.utcnow()
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                insert(ChatHistory)
+                .values(
+                    user_id=user_id,
+                    instruction=instruction,
+                    history=history,
+                    summary=summary,
+                    updated_at=now,
+                )
+                .on_conflict_do_update(
+                    index_elements=[ChatHistory.user_id],
+                    set_={
+                        "instruction": instruction,
+                        "history": history,
+                        "summary": summary,
+                        "updated_at": now,
+                    },
+                )
+            )
+
+
+async def delete_chat_history(user_id: int) -> None:
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                delete(ChatHistory).where(ChatHistory.user_id == user_id)
+            )
@@ -1,6 +1,7 @@
 from datetime import datetime
+from typing import Dict, List, Optional
 
-from sqlalchemy import Column, DateTime, Integer, String
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
 from sqlalchemy.future import select
 
 from .database_provider import Base, async_session
@@ -10,14 +11,16 @@ class Music(Base):
     __tablename__ = "musics"
     id = Column(Integer, primary_key=True, autoincrement=True)
     message_id = Column(Integer, nullable=False)
+    # Log channel holding the message, None for the default config.channel_log
+    chat_id = Column(BigInteger, nullable=True)
     url = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
 
-async def add_music(message_id: int, url: str) -> Music:
+async def add_music(message_id: int, url: str, chat_id: Optional[int] = None) -> Music:
     async with async_session() as session:
         async with session.begin():
-            music = Music(message_id=message_id, url=url)
+            music = Music(message_id=message_id, url=url, chat_id=chat_id)
             session.add(music)
         await session.commit()
         await session.refresh(music)
@@ -28,3 +31,29 @@ async def get_music_by_url(url: str) -> Music:
     async with async_session() as session:
         result = await session.execute(select(Music).where(Music.url == url))
         return result.scalars().first()
+
+
+async def get_musics_by_urls(urls: List[str]) -> Dict[str, Music]:
+    if not urls:
+        return {}
+    async with async_session() as session:
+        result = await session.execute(select(Music).where(Music.url.in_(set(urls))))
+        return {music.url: music for music in result.scalars().all()}
+
+
+async def save_music(message_id: int, url: str, chat_id: Optional[int] = None) -> Music:
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(select(Music).where(Music.url == url))
+            musics = result.scalars().all()
+            if not musics:
+                music = Music(message_id=message_id, url=url, chat_id=chat_id)
+                session.add(music)
+            else:
+                music, *duplicates = musics
+                music.message_id = message_id
+                music.chat_id = chat_id
+                for duplicate in duplicates:
+                    await session.delete(duplicate)
+        await session.refresh(music)
+        return music
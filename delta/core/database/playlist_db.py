@@ -0,0 +1,82 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import (
+    JSON,
+    BigInteger,
+    Column,
+    DateTime,
+    Integer,
+    String,
+    UniqueConstraint,
+    literal_column,
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .database_provider import Base, async_session
+
+
+class PlaylistSubscription(Base):
+    __tablename__ = "playlist_subscriptions"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chat_id = Column(BigInteger, nullable=False, index=True)
+    playlist_id = Column(String, nullable=False, index=True)
+    snapshot_id = Column(String, nullable=True)
+    track_ids = Column(JSON, nullable=False, default=list)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "chat_id", "playlist_id", name="uq_playlist_subscriptions_chat_playlist"
+        ),
+    )
+
+
+# Union of the stored and the newly delivered track ids, merged in the
+# database so concurrent updates of one subscription can not lose ids
+MERGED_TRACK_IDS = literal_column(
+    "(SELECT COALESCE(json_agg(ids.id ORDER BY ids.id), '[]'::json) FROM ("
+    "SELECT json_array_elements_text(playlist_subscriptions.track_ids) AS id "
+    "UNION SELECT json_array_elements_text(excluded.track_ids)) AS ids)"
+)
+
+
+async def get_playlist_subscription(
+    chat_id: int, playlist_id: str
+) -> Optional[PlaylistSubscription]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(PlaylistSubscription).filter(
+                PlaylistSubscription.chat_id == chat_id,
+                PlaylistSubscription.playlist_id == playlist_id,
+            )
+        )
+        return result.scalars().first()
+
+
+async def update_playlist_subscription(
+    chat_id: int,
+    playlist_id: str,
+    snapshot_id: Optional[str],
+    delivered_ids: Iterable[str],
+) -> None:
+    now = datetime.utcnow()
+    statement = insert(PlaylistSubscription).values(
+        chat_id=chat_id,
+        playlist_id=playlist_id,
+        snapshot_id=snapshot_id,
+        track_ids=sorted(set(delivered_ids)),
+        updated_at=now,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[PlaylistSubscription.chat_id, PlaylistSubscription.playlist_id],
+        set_={
+            "snapshot_id": statement.excluded.snapshot_id,
+            "track_ids": MERGED_TRACK_IDS,
+            "updated_at": now,
+        },
+    )
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(statement)
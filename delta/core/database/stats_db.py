@@ -0,0 +1,80 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, List
+
+from sqlalchemy import Column, DateTime, Integer, String, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .database_provider import Base, async_session
+
+
+class TrackStat(Base):
+    __tablename__ = "track_stats"
+    url = Column(String, primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+    misses = Column(Integer, nullable=False, default=0)
+    last_requested = Column(DateTime, nullable=False, default=datetime.utcnow)
+    refreshed_at = Column(DateTime, nullable=True)
+
+
+async def record_requests(hits: Iterable[str] = (), misses: Iterable[str] = ()) -> None:
+    hit_counts, miss_counts = Counter(hits), Counter(misses)
+    urls = set(hit_counts) | set(miss_counts)
+    if not urls:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {
+            "url": url,
+            "hits": hit_counts[url],
+            "misses": miss_counts[url],
+            "last_requested": now,
+        }
+        for url in sorted(urls)
+    ]
+    statement = insert(TrackStat).values(rows)
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[TrackStat.url],
+                    set_={
+                        "hits": TrackStat.hits + statement.excluded.hits,
+                        "misses": TrackStat.misses + statement.excluded.misses,
+                        "last_requested": statement.excluded.last_requested,
+                    },
+                )
+            )
+
+
+async def get_tracks_to_refresh(
+    limit: int, requested_since: datetime, stale_before: datetime
+) -> List[TrackStat]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(TrackStat)
+            .where(
+                TrackStat.last_requested >= requested_since,
+                or_(
+                    TrackStat.refreshed_at.is_(None),
+                    TrackStat.refreshed_at < stale_before,
+                ),
+            )
+            .order_by((TrackStat.hits + TrackStat.misses).desc())
+            .limit(limit)
+        )
+        return result.scalars().all()
+
+
+async def mark_refreshed(urls: Iterable[str]) -> None:
+    urls = list(urls)
+    if not urls:
+        return
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                update(TrackStat)
+                .where(TrackStat.url.in_(urls))
+                .values(refreshed_at=datetime.utcnow())
+            )
@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, DateTime, String, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .database_provider import Base, async_session
+
+
+class CallbackToken(Base):
+    __tablename__ = "callback_tokens"
+    token = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+async def add_token(token: str, value: str, expires_at: datetime) -> None:
+    async with async_session() as session:
+        async with session.begin():
+            await session.execute(
+                insert(CallbackToken)
+                .values(token=token, value=value, expires_at=expires_at)
+                .on_conflict_do_update(
+                    index_elements=[CallbackToken.token],
+                    set_={"value": value, "expires_at": expires_at},
+                )
+            )
+
+
+async def get_token(token: str) -> Optional[CallbackToken]:
+    async with async_session() as session:
+        result = await session.execute(
+            select(CallbackToken).where(
+                CallbackToken.token == token,
+                CallbackToken.expires_at > datetime.utcnow(),
+            )
+        )
+        return result.scalars().first()
+
+
+async def delete_expired_tokens() -> int:
+    async with async_session() as session:
+        async with session.begin():
+            result = await session.execute(
+                delete(CallbackToken).where(
+                    CallbackToken.expires_at <= datetime.utcnow()
+                )
+            )
+        return result.rowcount
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Optional, Tuple
+
+from pyrogram import Client
+
+from delta import config
+from delta.core.database.music_db import get_musics_by_urls
+from delta.core.database.stats_db import get_tracks_to_refresh, mark_refreshed
+from delta.helpers.delivery import fetch_cached_audio
+from delta.helpers.music import download_and_prepare_song, upload_to_log
+from delta.utils import spotify
+
+logger = logging.getLogger("DeltaX")
+
+
+def parse_window(value: str) -> Optional[Tuple[time, time]]:
+    """
+    Parse an off-peak window such as "02:00-06:00".
+
+    Args:
+        value: Window as "HH:MM-HH:MM", may wrap around midnight
+
+    Returns:
+        Tuple of start and end time, or None if the value is empty
+
+    Raises:
+        ValueError: If the value is not a valid window
+    """
+    if not value.strip():
+        return None
+    try:
+        start, end = (
+            datetime.strptime(part.strip(), "%H:%M").time()
+            for part in value.split("-", 1)
+        )
+    except ValueError:
+        raise ValueError(f"Invalid maintenance window: '{value}'")
+    return start, end
+
+
+class MaintenanceScheduler:
+    """
+    Background maintenance running during a configured off-peak window.
+
+    Picks the most requested tracks that were not refreshed recently,
+    checks their log channel messages in bulk and downloads and re-uploads
+    tracks that are not cached or whose message disappeared, so peak
+    traffic is served from the cache.
+    """
+
+    def __init__(
+        self,
+        window: Optional[Tuple[time, time]],
+        interval: float,
+        batch_size: int,
+        stale_days: int,
+        lookback_days: int = 30,
+    ):
+        self.window = window
+        self.interval = interval
+        self.batch_size = batch_size
+        self.stale_days = stale_days
+        self.lookback_days = lookback_days
+        self.client: Optional[Client] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, client: Client) -> None:
+        if not self.window:
+            return
+        self.client = client
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "Maintenance scheduled between %s and %s",
+            self.window[0].strftime("%H:%M"),
+            self.window[1].strftime("%H:%M"),
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def in_window(self, now: Optional[datetime] = None) -> bool:
+        if not self.window:
+            return False
+        current = (now or datetime.now()).time()
+        start, end = self.window
+        if start <= end:
+            return start <= current < end
+        return current >= start or current < end
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.in_window():
+                continue
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Maintenance run failed: {e}")
+
+    async def run_once(self) -> int:
+        """
+        Run one maintenance batch.
+
+        Returns:
+            Number of tracks that were re-uploaded
+        """
+        now = datetime.utcnow()
+        stats = await get_tracks_to_refresh(
+            limit=self.batch_size,
+            requested_since=now - timedelta(days=self.lookback_days),
+            stale_before=now - timedelta(days=self.stale_days),
+        )
+        if not stats:
+            return 0
+        urls = [stat.url for stat in stats]
+        records = await get_musics_by_urls(urls)
+        cached = await fetch_cached_audio(self.client, records)
+        missing = [url for url in urls if url not in cached]
+        logger.info(
+            "Maintenance: %d hot tracks checked, %d to re-upload",
+            len(urls),
+            len(missing),
+        )
+
+        refreshed = [url for url in urls if url in cached]
+        for url in missing:
+            if not self.in_window():
+                break
+            try:
+                await self.warm(url)
+                refreshed.append(url)
+            except Exception as e:
+                logger.error(f"Maintenance could not warm {url}: {e}")
+        await mark_refreshed(refreshed)
+        return len(refreshed) - len(cached)
+
+    async def warm(self, url: str) -> None:
+        """
+        Download a track and upload it to a log channel.
+
+        Args:
+            url: Song URL to warm
+        """
+        for song in await spotify.search([url]):
+            song, path = await download_and_prepare_song(song)
+            await upload_to_log(song, path)
+
+
+maintenance = MaintenanceScheduler(
+    window=parse_window(config.maintenance_window),
+    interval=config.maintenance_interval,
+    batch_size=config.maintenance_batch,
+    stale_days=config.maintenance_stale_days,
+)
@@ -4,7 +4,12 @@ from datetime import datetime
 from pyrogram import Client
 
 from delta import config
+from delta.core.client_pool import upload_pool
 from delta.core.database.system_db import clear_system, get_system
+from delta.core.maintenance import maintenance
+from delta.helpers.archiver import archive_queue
+from delta.helpers.eval_worker import eval_worker
+from delta.utils.gemini import gemini_chat
 
 from ..utils import format_duration
 
@@ -28,6 +33,9 @@ class DeltaBot:
         )
         await self.client.start()
         logger.info("Bot client started.")
+        await upload_pool.start(self.client)
+        maintenance.start(self.client)
+        gemini_chat.start()
 
         system = await get_system(self.client.me.id)
         if system:
@@ -55,6 +63,11 @@ class DeltaBot:
 
     async def stop(self):
         if self.client:
+            await maintenance.stop()
+            await archive_queue.drain()
+            await upload_pool.stop()
+            await gemini_chat.flush()
+            await eval_worker.stop()
             await self.client.stop()
             logger.info("Stoping bot client.")
 
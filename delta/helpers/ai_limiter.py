@@ -0,0 +1,140 @@
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Tuple
+
+from delta import config
+
+OWNER = 0
+PRIVATE = 1
+GROUP = 2
+
+
+class Busy(Exception):
+    """
+    Raised when a request can not be queued or waited too long for a slot.
+    """
+
+
+class AIRequestLimiter:
+    """
+    Orders and bounds the Gemini requests made by handlers.
+
+    Requests of one user run one at a time and in the order they arrived,
+    so two quick messages can not interleave the same chat history. All
+    requests share a global concurrency cap; when it is reached, waiting
+    requests are served by priority (owners, then private chats, then
+    groups) and new requests are rejected once the queue is full or a slot
+    does not free up in time.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_waiting: int,
+        max_per_user: int,
+        max_wait: float,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max_waiting
+        self.max_per_user = max(1, max_per_user)
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiting: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._users: Dict[int, Tuple[asyncio.Lock, int]] = {}
+        self.stats: Dict[str, int] = {"served": 0, "queued": 0, "rejected": 0}
+
+    @asynccontextmanager
+    async def slot(self, user_id: int, priority: int) -> AsyncIterator[None]:
+        """
+        Wait for the user's turn and a global slot.
+
+        Args:
+            user_id: User the request belongs to
+            priority: OWNER, PRIVATE or GROUP
+
+        Raises:
+            Busy: If the user or the global queue is full, or the user's turn
+                and a slot did not come up within the maximum wait
+        """
+        lock, pending = self._users.get(user_id, (None, 0))
+        if pending >= self.max_per_user:
+            self.stats["rejected"] += 1
+            raise Busy("You already have requests waiting")
+        if lock is None:
+            lock = asyncio.Lock()
+        self._users[user_id] = (lock, pending + 1)
+        # Both waits share one deadline
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), self.max_wait)
+            except asyncio.TimeoutError:
+                self.stats["rejected"] += 1
+                raise Busy("Your previous request is still running")
+            try:
+                await self._acquire(priority, deadline - loop.time())
+                try:
+                    self.stats["served"] += 1
+                    yield
+                finally:
+                    self._release()
+            finally:
+                lock.release()
+        finally:
+            lock, pending = self._users[user_id]
+            if pending <= 1:
+                del self._users[user_id]
+            else:
+                self._users[user_id] = (lock, pending - 1)
+
+    async def _acquire(self, priority: int, timeout: float) -> None:
+        if self._active < self.max_concurrent and not self._waiting:
+            self._active += 1
+            return
+        if len(self._waiting) >= self.max_waiting:
+            self.stats["rejected"] += 1
+            raise Busy("Too many requests right now")
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._counter), future))
+        self.stats["queued"] += 1
+        try:
+            # The slot is handed over by _release, _active already counts it
+            await asyncio.wait_for(asyncio.shield(future), max(0.0, timeout))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done():
+                # Granted while giving up, pass the slot on
+                self._release()
+            else:
+                future.cancel()
+                self._waiting = [w for w in self._waiting if w[2] is not future]
+                heapq.heapify(self._waiting)
+            if isinstance(e, asyncio.TimeoutError):
+                self.stats["rejected"] += 1
+                raise Busy("Too many requests right now")
+            raise
+
+    def _release(self) -> None:
+        if self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            future.set_result(None)
+        else:
+            self._active -= 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "active": self._active,
+            "waiting": len(self._waiting),
+        }
+
+
+ai_limiter = AIRequestLimiter(
+    max_concurrent=config.gemini_max_concurrent,
+    max_waiting=config.gemini_max_waiting,
+    max_per_user=config.gemini_max_per_user,
+    max_wait=config.gemini_max_wait,
+)
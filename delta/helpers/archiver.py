@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import random
+from typing import Optional
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from pyrogram.types import Message
+
+from delta.core.client_pool import upload_pool
+from delta.core.database.music_db import add_music
+
+logger = logging.getLogger("DeltaX")
+
+
+class ArchiveItem:
+    __slots__ = (
+        "client",
+        "chat_id",
+        "message_id",
+        "url",
+        "log_chat_id",
+        "log_message_id",
+        "attempt",
+    )
+
+    def __init__(self, client: Client, chat_id: int, message_id: int, url: str):
+        self.client = client
+        self.chat_id = chat_id
+        self.message_id = message_id
+        self.url = url
+        self.log_chat_id: Optional[int] = None
+        self.log_message_id: Optional[int] = None
+        self.attempt = 0
+
+
+class ArchiveQueue:
+    """
+    Background queue copying tracks delivered to users into the log channel.
+
+    Each item is copied to the least busy log channel and recorded with
+    ``add_music``. Failed steps are retried with jittered exponential
+    backoff, a copy that already succeeded is not repeated.
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 2.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._pending = 0
+
+    def submit(self, client: Client, message: Message, url: str) -> None:
+        """
+        Queue a delivered audio message for archiving.
+
+        Args:
+            client: The Pyrogram Client instance
+            message: Audio message sent to the user
+            url: Song URL the message belongs to
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+        self._pending += 1
+        self._queue.put_nowait(ArchiveItem(client, message.chat.id, message.id, url))
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._archive(item)
+                self._pending -= 1
+            except FloodWait as e:
+                logger.warning("FloodWait of %ss while archiving %s", e.value, item.url)
+                await asyncio.sleep(e.value)
+                self._queue.put_nowait(item)
+            except Exception as e:
+                item.attempt += 1
+                if item.attempt >= self.max_attempts:
+                    self._pending -= 1
+                    logger.error(
+                        f"Giving up archiving {item.url} after {item.attempt} attempts: {e}"
+                    )
+                else:
+                    delay = self.base_delay * 2 ** (item.attempt - 1)
+                    delay += random.uniform(0, delay / 2)
+                    logger.warning(
+                        f"Archiving {item.url} failed ({e}), retrying in {delay:.1f}s"
+                    )
+                    asyncio.get_running_loop().call_later(
+                        delay, self._queue.put_nowait, item
+                    )
+            finally:
+                self._queue.task_done()
+
+    async def _archive(self, item: ArchiveItem) -> None:
+        if item.log_message_id is None:
+            log_msg = await item.client.copy_message(
+                chat_id=upload_pool.next_channel(),
+                from_chat_id=item.chat_id,
+                message_id=item.message_id,
+            )
+            item.log_chat_id = log_msg.chat.id
+            item.log_message_id = log_msg.id
+        await add_music(
+            message_id=item.log_message_id, url=item.url, chat_id=item.log_chat_id
+        )
+
+    async def drain(self, timeout: float = 30.0) -> None:
+        """
+        Wait for queued items to be archived, used on shutdown.
+
+        Args:
+            timeout: Maximum seconds to wait
+        """
+        if self._queue is None or self._pending == 0:
+            return
+        try:
+            await asyncio.wait_for(self._drained(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Shutting down with %d tracks not archived", self._pending)
+        if self._worker:
+            self._worker.cancel()
+
+    async def _drained(self) -> None:
+        while self._pending > 0:
+            await asyncio.sleep(0.5)
+
+
+archive_queue = ArchiveQueue()
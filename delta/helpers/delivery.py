@@ -0,0 +1,130 @@
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pyrogram import Client
+from pyrogram.errors import FloodWait
+from pyrogram.types import InputMediaAudio, Message, ReplyParameters
+
+from delta import config
+from delta.core.database.music_db import Music
+
+logger = logging.getLogger("DeltaX")
+
+# Telegram limits
+GET_MESSAGES_LIMIT = 200
+MEDIA_GROUP_LIMIT = 10
+
+
+async def _with_flood_wait(func, *args, retries: int = 3, **kwargs):
+    for attempt in range(retries + 1):
+        try:
+            return await func(*args, **kwargs)
+        except FloodWait as e:
+            if attempt == retries:
+                raise
+            logger.warning("FloodWait of %ss on %s", e.value, func.__name__)
+            await asyncio.sleep(e.value)
+
+
+async def fetch_cached_audio(
+    client: Client, records: Dict[str, Music]
+) -> Dict[str, Message]:
+    """
+    Fetch cached log channel messages in batches and keep the valid ones.
+
+    Args:
+        client: The Pyrogram Client instance
+        records: Music records keyed by song URL
+
+    Returns:
+        Log channel messages that still hold audio, keyed by song URL
+    """
+    # Records are sharded over several log channels, batch per channel
+    urls_by_channel: Dict[int, Dict[int, str]] = defaultdict(dict)
+    for url, record in records.items():
+        if record.message_id:
+            channel = record.chat_id or config.channel_log
+            urls_by_channel[channel][record.message_id] = url
+
+    cached: Dict[str, Message] = {}
+    for channel, urls_by_id in urls_by_channel.items():
+        message_ids = list(urls_by_id)
+        for i in range(0, len(message_ids), GET_MESSAGES_LIMIT):
+            chunk = message_ids[i : i + GET_MESSAGES_LIMIT]
+            try:
+                messages = await _with_flood_wait(client.get_messages, channel, chunk)
+            except Exception as e:
+                logger.error(f"Error fetching cached messages from {channel}: {e}")
+                continue
+            for msg in messages:
+                if msg and not msg.empty and msg.audio:
+                    cached[urls_by_id[msg.id]] = msg
+    return cached
+
+
+async def send_cached_audio(
+    client: Client,
+    chat_id: int,
+    messages: List[Message],
+    reply_to_message_id: Optional[int] = None,
+) -> Tuple[int, Optional[int]]:
+    """
+    Send cached audio messages as media groups of up to 10 tracks.
+
+    Sending stops at the first group that fails, the caller gets the
+    number of messages delivered so it can fall back for the rest.
+
+    Args:
+        client: The Pyrogram Client instance
+        chat_id: Chat to deliver the tracks to
+        messages: Log channel messages holding the audio, in delivery order
+        reply_to_message_id: Message the first group replies to
+
+    Returns:
+        Number of leading messages that were sent and the ID of the last
+        message sent, or None if nothing was sent
+    """
+    last_id = None
+    sent_count = 0
+    for i in range(0, len(messages), MEDIA_GROUP_LIMIT):
+        chunk = messages[i : i + MEDIA_GROUP_LIMIT]
+        reply_parameters = (
+            ReplyParameters(message_id=reply_to_message_id)
+            if reply_to_message_id
+            else None
+        )
+        try:
+            if len(chunk) == 1:
+                sent = [
+                    await _with_flood_wait(
+                        client.copy_message,
+                        chat_id=chat_id,
+                        from_chat_id=chunk[0].chat.id,
+                        message_id=chunk[0].id,
+                        reply_parameters=reply_parameters,
+                    )
+                ]
+            else:
+                sent = await _with_flood_wait(
+                    client.send_media_group,
+                    chat_id=chat_id,
+                    media=[
+                        InputMediaAudio(
+                            media=msg.audio.file_id,
+                            caption=msg.caption or "",
+                            caption_entities=msg.caption_entities,
+                        )
+                        for msg in chunk
+                    ],
+                    reply_parameters=reply_parameters,
+                )
+        except Exception as e:
+            logger.error(f"Error sending {len(chunk)} cached tracks: {e}")
+            break
+        sent_count += len(chunk)
+        if sent:
+            last_id = sent[-1].id
+            reply_to_message_id = last_id
+    return sent_count, last_id
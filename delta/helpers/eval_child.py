@@ -0,0 +1,117 @@
+"""
+Eval worker process.
+
+Started by delta.helpers.eval_worker and run by path, so it only depends
+on the standard library. Reads one JSON request per line from stdin and
+executes it in a namespace that persists between requests, streaming
+everything the code prints back to the parent as JSON lines.
+"""
+
+import ast
+import asyncio
+import contextlib
+import inspect
+import json
+import sys
+import textwrap
+import threading
+import traceback
+
+_protocol = sys.stdout
+_lock = threading.Lock()
+# Characters per output message, escaped JSON stays well below the line
+# limit of the parent
+CHUNK_SIZE = 64 * 1024
+
+
+def send(**payload) -> None:
+    with _lock:
+        _protocol.write(json.dumps(payload) + "\n")
+        _protocol.flush()
+
+
+class Output:
+    """
+    File-like object forwarding writes of the running request.
+    """
+
+    def __init__(self, request_id: int):
+        self.request_id = request_id
+
+    def write(self, text: str) -> int:
+        for start in range(0, len(text), CHUNK_SIZE):
+            send(id=self.request_id, out=text[start : start + CHUNK_SIZE])
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def limit_memory(megabytes: int) -> None:
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = megabytes * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def prepare(code: str) -> str:
+    # Same convenience as the in-loop eval: a leading return is a function body
+    if code.lstrip().startswith("return"):
+        return (
+            "async def __wrapped__():\n"
+            + textwrap.indent(code, "    ")
+            + "\nprint(await __wrapped__())"
+        )
+    return code
+
+
+def compile_request(code: str):
+    """
+    Compile code, turning a trailing expression into a printed result.
+    """
+    tree = ast.parse(code, "<eval>", "exec")
+    if tree.body and isinstance(tree.body[-1], ast.Expr):
+        last = tree.body[-1]
+        tree.body[-1] = ast.Assign(
+            targets=[ast.Name(id="_", ctx=ast.Store())], value=last.value
+        )
+        ast.copy_location(tree.body[-1], last)
+        tree.body.append(ast.parse("if _ is not None: print(_)").body[0])
+    ast.fix_missing_locations(tree)
+    return compile(tree, "<eval>", "exec", flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT)
+
+
+def main() -> None:
+    if len(sys.argv) > 1 and int(sys.argv[1]) > 0:
+        limit_memory(int(sys.argv[1]))
+    # Code must not write into the protocol stream by accident
+    sys.stdout = sys.stderr
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    namespace = {"__name__": "__main__", "asyncio": asyncio, "src": inspect.getsource}
+    send(ready=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        request_id = request["id"]
+        output = Output(request_id)
+        error = None
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            try:
+                result = eval(compile_request(prepare(request["code"])), namespace)
+                if inspect.iscoroutine(result):
+                    loop.run_until_complete(result)
+            except BaseException as e:
+                # Leave out the worker's own frame
+                error = "".join(
+                    traceback.format_exception(type(e), e, e.__traceback__.tb_next)
+                )
+        send(id=request_id, done=True, error=error)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+import sys
+from typing import Awaitable, Callable, Optional, Tuple
+
+from delta import config
+
+logger = logging.getLogger("DeltaX")
+
+CHILD_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_child.py")
+
+
+class EvalTimeout(Exception):
+    """
+    Raised when code ran longer than the worker timeout and was killed.
+    """
+
+    def __init__(self, message: str, output: str = ""):
+        super().__init__(message)
+        self.output = output
+
+
+class EvalWorker:
+    """
+    Runs /eval code in a separate Python process.
+
+    The process keeps its namespace between runs, so variables survive like
+    in the in-loop eval, but blocking or CPU heavy code can not freeze the
+    bot. Output is streamed back while the code runs. A run that exceeds
+    the timeout or is aborted kills the process; the next run starts a
+    fresh one.
+    """
+
+    def __init__(self, timeout: float, memory_limit: int, max_output: int = 1 << 20):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_output = max_output
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def _ensure_started(self) -> asyncio.subprocess.Process:
+        if self.running:
+            return self.process
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-u",
+            CHILD_SCRIPT,
+            str(self.memory_limit),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            limit=self.max_output,
+        )
+        try:
+            line = await asyncio.wait_for(self.process.stdout.readline(), 30)
+            if line.strip() != b'{"ready": true}':
+                raise RuntimeError(
+                    f"Eval worker failed to start: {line.decode(errors='replace')}"
+                )
+        except BaseException:
+            await self.kill()
+            raise
+        logger.info("Eval worker started with pid %s", self.process.pid)
+        return self.process
+
+    async def run(
+        self,
+        code: str,
+        on_output: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Run code in the worker.
+
+        Args:
+            code: Python code, top level await is allowed
+            on_output: Coroutine called with the output so far whenever
+                the code prints something
+
+        Returns:
+            Tuple with the output and the formatted traceback, if any
+
+        Raises:
+            EvalTimeout: If the code ran longer than the timeout
+            RuntimeError: If the worker could not be started
+            asyncio.TimeoutError: If the worker did not start in time
+        """
+        async with self._lock:
+            process = await self._ensure_started()
+            request_id = next(self._ids)
+            process.stdin.write(
+                (json.dumps({"id": request_id, "code": code}) + "\n").encode()
+            )
+            await process.stdin.drain()
+
+            output = ""
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.timeout
+            try:
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    try:
+                        line = await asyncio.wait_for(
+                            process.stdout.readline(), remaining
+                        )
+                    except (ValueError, asyncio.LimitOverrunError) as e:
+                        # The rest of the line is still in the pipe, the
+                        # protocol can not recover from here
+                        await self.kill()
+                        return output, f"Eval worker output was unreadable: {e}"
+                    if not line:
+                        returncode = await process.wait()
+                        self.process = None
+                        return output, f"Eval worker exited with code {returncode}"
+                    try:
+                        message = json.loads(line)
+                    except ValueError:
+                        # Written straight to the worker's stderr
+                        message = {
+                            "id": request_id,
+                            "out": line.decode(errors="replace"),
+                        }
+                    if message.get("id") != request_id:
+                        continue
+                    if message.get("done"):
+                        return output, message.get("error")
+                    output = (output + message.get("out", ""))[-self.max_output :]
+                    if on_output:
+                        await on_output(output)
+            except asyncio.TimeoutError:
+                await self.kill()
+                raise EvalTimeout(
+                    f"Killed after {self.timeout:.0f}s, the worker namespace was reset",
+                    output,
+                )
+            except asyncio.CancelledError:
+                await self.kill()
+                raise
+
+    async def kill(self) -> None:
+        """
+        Kill the worker process, dropping its namespace.
+        """
+        process, self.process = self.process, None
+        if process and process.returncode is None:
+            process.kill()
+            await process.wait()
+            logger.info("Eval worker %s killed", process.pid)
+
+    async def stop(self) -> None:
+        await self.kill()
+
+
+eval_worker = EvalWorker(
+    timeout=config.eval_timeout, memory_limit=config.eval_memory_limit
+)
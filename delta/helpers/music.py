@@ -0,0 +1,168 @@
+import html
+import io
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple, Union
+
+from aiopath import AsyncPath
+from pyrogram import Client
+from pyrogram.types import Message
+from spotdl import Song
+
+from delta import config
+from delta.core.client_pool import upload_pool
+from delta.core.database.music_db import save_music
+from delta.helpers.progress import progress_func
+from delta.utils import spotify
+from delta.utils.spotify import DownloadJob, Track
+
+logger = logging.getLogger("DeltaX")
+
+UploadFile = Union[str, io.BytesIO]
+
+
+class MemoryBudget:
+    """
+    Global byte budget for uploads kept in memory.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.used = 0
+
+    def try_acquire(self, size: int) -> bool:
+        if self.used + size > self.limit:
+            return False
+        self.used += size
+        return True
+
+    def release(self, size: int) -> None:
+        self.used = max(0, self.used - size)
+
+
+memory_budget = MemoryBudget(config.in_memory_budget)
+
+
+async def download_and_prepare_song(
+    song: Union[Song, Track], job: Optional[DownloadJob] = None
+) -> Tuple[Song, str]:
+    try:
+        song, path = await spotify.download(song, job)
+        if not path:
+            raise Exception(f"Download failed for {song.display_name}")
+        return song, str(path)
+    except Exception as error:
+        raise error
+
+
+def build_song_caption(song: Song) -> str:
+    display_name = html.escape(getattr(song, "display_name", "Unknown Title"))
+    artist = html.escape(getattr(song, "artist", "Unknown Artist"))
+    album = html.escape(getattr(song, "album_name", "Unknown Album"))
+
+    # Convert duration from seconds to minutes and seconds
+    duration_val = getattr(song, "duration", None)
+    if duration_val is None or not str(duration_val).isdigit():
+        duration_str = "Unknown Duration"
+    else:
+        duration_seconds = int(duration_val)
+        minutes = duration_seconds // 60
+        seconds = duration_seconds % 60
+        duration_str = f"{minutes} min {seconds} sec"
+
+    explicit = getattr(song, "explicit", "No")
+    publisher = html.escape(getattr(song, "publisher", "Unknown Publisher"))
+    popularity = getattr(song, "popularity", "0")
+    year = getattr(song, "year", "0")
+    caption = (
+        f"<b>{display_name}</b>\n\n"
+        f'<pre language="Artist">{artist}</pre>\n'
+        f'<pre language="Album">{album}</pre>\n'
+        f'<pre language="Year">{year}</pre>\n'
+        f'<pre language="Duration">{duration_str}</pre>\n'
+        f'<pre language="Explicit">{explicit}</pre>\n'
+        f'<pre language="Popularity">{popularity}</pre>\n'
+        f'<pre language="Publisher">{publisher}</pre>\n'
+    )
+    return caption
+
+
+@asynccontextmanager
+async def upload_files(
+    song: Song, path: str
+) -> AsyncIterator[Tuple[UploadFile, Optional[UploadFile]]]:
+    """
+    Prepare the audio and thumbnail of a downloaded song for upload.
+
+    With in-memory uploads enabled, files under the size threshold are read
+    into a buffer and removed from disk right away and the thumbnail never
+    touches the disk. Everything else, or anything over the memory budget,
+    is uploaded from disk. Files are removed on exit either way.
+
+    Args:
+        song: The downloaded song
+        path: Path to the audio file
+
+    Yields:
+        Tuple of the audio and thumbnail to pass to send_audio
+    """
+    audio: UploadFile = path
+    thumb: Optional[UploadFile] = None
+    reserved = 0
+    try:
+        size = os.path.getsize(path)
+        if (
+            config.in_memory_upload
+            and size <= config.in_memory_max_file
+            and memory_budget.try_acquire(size)
+        ):
+            reserved = size
+            audio = io.BytesIO(await AsyncPath(path).read_bytes())
+            audio.name = os.path.basename(path)
+            os.remove(path)
+        try:
+            if reserved:
+                thumb = await spotify.download_thumbnail_bytes(song)
+            else:
+                thumb = await spotify.download_thumbnail(song, os.path.dirname(path))
+        except Exception as e:
+            logger.warning(f"No thumbnail for {song.display_name}: {e}")
+        yield audio, thumb
+    finally:
+        memory_budget.release(reserved)
+        for file in (path, thumb):
+            if isinstance(file, str) and os.path.exists(file):
+                os.remove(file)
+
+
+async def upload_to_log(
+    song: Song, path: str, progress_message: Optional[Message] = None
+) -> Tuple[Client, Message]:
+    """
+    Upload a downloaded song to a log channel and record it in the cache.
+
+    Args:
+        song: The downloaded song
+        path: Path to the audio file, removed once uploaded
+        progress_message: Optional message to report upload progress on
+
+    Returns:
+        Tuple of the client that uploaded and the log channel message
+    """
+    caption = build_song_caption(song)
+    async with upload_files(song, path) as (audio, thumb):
+        start_time = time.time()
+        uploader, log_msg = await upload_pool.send_audio(
+            audio=audio,
+            caption=caption,
+            title=song.name,
+            performer=song.artist,
+            duration=int(song.duration),
+            thumb=thumb,
+            progress=progress_func if progress_message else None,
+            progress_args=(progress_message, start_time, "upload", song.name),
+        )
+    await save_music(message_id=log_msg.id, url=song.url, chat_id=log_msg.chat.id)
+    return uploader, log_msg
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from delta import config
+from delta.utils import spotify
+
+logger = logging.getLogger("DeltaX")
+
+
+class Prefetcher:
+    """
+    Speculative downloads of the result a user is most likely to pick.
+
+    A prefetch waits for a short dwell before it starts, so results of a
+    query the user is still typing are never fetched. It is cancelled when
+    the same user sends another query during the dwell, unless a callback
+    has already claimed it; a fetch that has started is left to finish so
+    no half-downloaded file is abandoned. Prefetches are skipped while real
+    downloads are busy, and concurrency and the number started per hour
+    are capped so prefetching can not crowd out real downloads.
+    """
+
+    def __init__(
+        self,
+        dwell: float,
+        max_active: int,
+        hourly_budget: int,
+        busy: Optional[Callable[[], bool]] = None,
+    ):
+        self.dwell = dwell
+        self.max_active = max_active
+        self.hourly_budget = hourly_budget
+        self.busy = busy
+        self._by_user: Dict[int, Tuple[str, asyncio.Task]] = {}
+        self._by_url: Dict[str, asyncio.Task] = {}
+        self._claimed: set = set()
+        self._running: set = set()
+        self._started: Deque[float] = deque()
+        self._active = 0
+        self.stats: Dict[str, int] = {
+            "scheduled": 0,
+            "started": 0,
+            "completed": 0,
+            "cancelled": 0,
+            "claimed": 0,
+            "failed": 0,
+            "over_budget": 0,
+            "busy": 0,
+        }
+
+    def schedule(
+        self, user_id: int, url: str, fetch: Callable[[], Awaitable[Any]]
+    ) -> None:
+        """
+        Schedule a prefetch for the user's top result.
+
+        Args:
+            user_id: User who sent the inline query
+            url: Song URL to prefetch
+            fetch: Coroutine factory downloading the song into the cache
+        """
+        previous = self._by_user.pop(user_id, None)
+        if previous and previous[0] == url:
+            self._by_user[user_id] = previous
+            return
+        if previous:
+            self._release(*previous)
+        task = self._by_url.get(url)
+        if task is None:
+            task = asyncio.create_task(self._run(url, fetch))
+            self._by_url[url] = task
+            task.add_done_callback(lambda done: self._forget(url, done))
+            self.stats["scheduled"] += 1
+        self._by_user[user_id] = (url, task)
+
+    def _release(self, url: str, task: asyncio.Task) -> None:
+        # Keep prefetches a callback is waiting on or another user may pick,
+        # and let started ones finish
+        if task.done() or url in self._claimed or url in self._running:
+            return
+        if any(other is task for _, other in self._by_user.values()):
+            return
+        task.cancel()
+        self.stats["cancelled"] += 1
+
+    def _forget(self, url: str, task: asyncio.Task) -> None:
+        self._by_url.pop(url, None)
+        self._claimed.discard(url)
+        for user_id in [u for u, (_, t) in self._by_user.items() if t is task]:
+            del self._by_user[user_id]
+
+    def _within_budget(self) -> bool:
+        now = time.monotonic()
+        while self._started and now - self._started[0] > 3600:
+            self._started.popleft()
+        return (
+            self._active < self.max_active and len(self._started) < self.hourly_budget
+        )
+
+    async def _run(self, url: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        await asyncio.sleep(self.dwell)
+        if self.busy and self.busy():
+            self.stats["busy"] += 1
+            return
+        if not self._within_budget():
+            self.stats["over_budget"] += 1
+            return
+        self._started.append(time.monotonic())
+        self._active += 1
+        self._running.add(url)
+        self.stats["started"] += 1
+        try:
+            await fetch()
+            self.stats["completed"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Prefetch of {url} failed: {e}")
+        finally:
+            self._active -= 1
+            self._running.discard(url)
+
+    async def wait_for(self, url: str) -> None:
+        """
+        Claim a running prefetch and wait for it to finish.
+
+        Args:
+            url: Song URL the callback asked for
+        """
+        task = self._by_url.get(url)
+        if task is None or task.done():
+            return
+        self._claimed.add(url)
+        self.stats["claimed"] += 1
+        try:
+            await asyncio.shield(task)
+        except (asyncio.CancelledError, Exception):
+            pass
+
+
+prefetcher = Prefetcher(
+    dwell=config.prefetch_dwell,
+    max_active=config.prefetch_max_active,
+    hourly_budget=config.prefetch_hourly_budget,
+    # Every download slot is taken by user requests
+    busy=spotify.downloader.semaphore.locked,
+)
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Optional
+
+from pyrogram.errors import FloodWait, MessageNotModified
+from pyrogram.types import Message
+
+logger = logging.getLogger("DeltaX")
+
+
+class StreamedReply:
+    """
+    Reply that grows while a response is streamed.
+
+    The first message is posted as soon as text arrives and then edited at
+    most once per interval. When the text passes the page limit the current
+    message is finished and the rest continues in a reply to it.
+    """
+
+    def __init__(self, message: Message, interval: float = 1.5, limit: int = 4000):
+        self.message = message
+        self.interval = interval
+        self.limit = limit
+        self.text = ""
+        self._first: Optional[Message] = None
+        self._current: Optional[Message] = None
+        self._page_start = 0
+        self._shown = ""
+        self._next_edit = 0.0
+
+    async def consume(self, chunks: AsyncIterator[str]) -> str:
+        """
+        Stream text chunks into the reply.
+
+        Args:
+            chunks: Text deltas of the response
+
+        Returns:
+            The complete response text
+
+        Raises:
+            ValueError: If the response did not contain any text
+        """
+        async for chunk in chunks:
+            self.text += chunk
+            if time.monotonic() >= self._next_edit:
+                await self._flush(final=False)
+        if not self.text.strip():
+            raise ValueError("Empty response")
+        await self._flush(final=True)
+        return self.text
+
+    async def _flush(self, final: bool) -> None:
+        while len(self.text) - self._page_start > self.limit:
+            end = self._page_start + self.limit
+            await self._show(self.text[self._page_start : end], final=True)
+            self._page_start = end
+            self._current = None
+            self._shown = ""
+        page = self.text[self._page_start :]
+        if page.strip():
+            await self._show(page, final)
+        self._next_edit = max(self._next_edit, time.monotonic() + self.interval)
+
+    async def _show(self, page: str, final: bool) -> None:
+        if page == self._shown:
+            return
+        while True:
+            try:
+                if self._current is None:
+                    # Later pages reply to the first one, like split replies
+                    self._current = await (self._first or self.message).reply_text(page)
+                    self._first = self._first or self._current
+                else:
+                    await self._current.edit_text(page)
+                self._shown = page
+                return
+            except MessageNotModified:
+                self._shown = page
+                return
+            except FloodWait as e:
+                if not final:
+                    # Skip this update, a later one carries the same text
+                    self._next_edit = time.monotonic() + e.value
+                    return
+                logger.warning("FloodWait of %ss while streaming a reply", e.value)
+                await asyncio.sleep(e.value)
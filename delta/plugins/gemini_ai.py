@@ -1,8 +1,31 @@
-from aiopath import AsyncPath
+import asyncio
+import logging
+from typing import List
+
 from pyrogram import Client, filters, types
-from pyrogram.enums import ChatAction  # Import enum for chat actions
+from pyrogram.enums import ChatAction, ChatType  # Import enum for chat actions
 
+from delta import config
+from delta.filters import owner_only
+from delta.helpers.ai_limiter import GROUP, OWNER, PRIVATE, Busy, ai_limiter
+from delta.helpers.streaming import StreamedReply
 from delta.utils import gemini_chat
+from delta.utils.gemini import (
+    ALBUM_PROMPT,
+    IMAGE_PROMPT,
+    history_stats,
+    response_cache,
+)
+from delta.utils.gemini_pool import gemini_pool
+from delta.utils.gemini_router import model_router
+
+logger = logging.getLogger("DeltaX")
+
+
+def pick_photo_size(photo: types.Photo, target: int):
+    """Returns the smallest size of the photo that still covers 'target' pixels."""
+    sizes = sorted([photo, *(photo.thumbs or [])], key=lambda s: s.width * s.height)
+    return next((s for s in sizes if max(s.width, s.height) >= target), sizes[-1])
 
 
 def split_text(text: str, limit: int = 4000) -> list[str]:
@@ -15,10 +38,55 @@ async def clear_chat_session(client: Client, message: types.Message):
     user: types.User = message.from_user
     if not user:
         return
-    await gemini_chat.remove_chat(user.id)
+    try:
+        await gemini_chat.remove_chat(user.id)
+    except Exception as e:
+        logger.error(f"Failed to clear chat history of {user.id}: {e}")
+        return await message.reply("Could not clear the chat history, try again.")
     return await message.reply("Done!")
 
 
+@Client.on_message(owner_only & filters.command("aistats"))
+async def ai_stats_cmd(client: Client, message: types.Message) -> None:
+    chats = gemini_chat.memory_stats()
+    keys = "\n".join(
+        f"{key['key']}: {key['inflight']} in flight, {key['requests']} requests, "
+        f"errors {key['error_rate']:.0%}"
+        + (f", cooling down {key['cooldown']:.0f}s" if key["cooldown"] else "")
+        for key in gemini_pool.stats()
+    )
+    cache = response_cache.stats() if response_cache else None
+    history = history_stats.snapshot()
+    queue = ai_limiter.snapshot()
+    routes = "\n".join(
+        f"{name}: {route['requests']:.0f} requests, avg {route['avg']:.2f}s, "
+        f"max {route['max']:.2f}s, {route['errors']:.0f} errors"
+        for name, route in model_router.snapshot().items()
+    )
+    await message.reply_text(
+        f"<b>Chats:</b> {chats['active']} active, "
+        f"{chats['history_chars']} history chars, {chats['evicted']} evicted, "
+        f"{chats['restored']} restored\n"
+        f"<b>History per request:</b> avg {history['avg_tokens']:.0f}, "
+        f"max {history['max_tokens']} tokens over {history['requests']} requests, "
+        f"{history['compactions']} compactions, {history['summaries']} summaries, "
+        f"{history['dropped_turns']} turns dropped\n"
+        f"<b>Requests:</b> {queue['active']} active, {queue['waiting']} waiting, "
+        f"{queue['served']} served, {queue['queued']} queued, "
+        f"{queue['rejected']} rejected\n"
+        f"<b>Routes</b>\n<pre>{routes or 'None'}</pre>\n"
+        f"<b>Keys</b>\n<pre>{keys or 'None'}</pre>\n"
+        + (
+            f"<b>Response cache:</b> {cache['size']}/{cache['maxsize']}, "
+            f"hit rate {cache['hit_rate']:.0%}, hits {cache['hits']}, "
+            f"misses {cache['misses']}"
+            if cache
+            else "<b>Response cache:</b> disabled"
+        ),
+        quote=True,
+    )
+
+
 @Client.on_message(filters.mentioned | filters.command(["ai", "delta"]))
 async def chatai(client: Client, message: types.Message) -> None:
     target_user = (
@@ -31,12 +99,32 @@ async def chatai(client: Client, message: types.Message) -> None:
     if not target_user:
         return
 
+    # A bare command has no prompt of its own
     text = (
         " ".join(message.command[1:])
-        if message.command and len(message.command) > 1
+        if message.command
         else (message.text or message.caption or "")
     )
 
+    try:
+        async with ai_limiter.slot(target_user.id, request_priority(message)):
+            await answer(client, message, target_user, text)
+    except Busy as e:
+        await message.reply_text(f"Busy: {e}. Please try again in a moment.")
+
+
+def request_priority(message: types.Message) -> int:
+    """Returns the queue priority of an /ai request."""
+    if message.from_user and message.from_user.id in config.owner_id:
+        return OWNER
+    if message.chat.type == ChatType.PRIVATE:
+        return PRIVATE
+    return GROUP
+
+
+async def answer(
+    client: Client, message: types.Message, target_user: types.User, text: str
+) -> None:
     ai = await gemini_chat.get_chat(target_user.id)
     msg = message.reply_to_message or message
 
@@ -44,11 +132,29 @@ async def chatai(client: Client, message: types.Message) -> None:
     await client.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING)
 
     if getattr(msg, "photo", None):
-        photo_path = None
         try:
-            photo_path = await msg.download()
-            async_photo = AsyncPath(photo_path)
-            resp = await ai.vision(photo_path, str(text))
+            photos = [msg]
+            if msg.media_group_id:
+                # Answer for the whole album in one request
+                album = await client.get_media_group(msg.chat.id, msg.id)
+                photos = [m for m in album if m.photo] or photos
+            sizes = [pick_photo_size(m.photo, config.gemini_image_size) for m in photos]
+
+            async def load_photos() -> List[bytes]:
+                files = await asyncio.gather(
+                    *(
+                        client.download_media(size.file_id, in_memory=True)
+                        for size in sizes
+                    )
+                )
+                return [file.getvalue() for file in files]
+
+            prompt = str(text) or (ALBUM_PROMPT if len(photos) > 1 else IMAGE_PROMPT)
+            resp = await ai.vision(
+                load_photos,
+                prompt,
+                image_id=",".join(m.photo.file_unique_id for m in photos),
+            )
             # Check if response exceeds 4000 characters
             if len(resp) > 4000:
                 parts = split_text(resp, 4000)
@@ -59,14 +165,18 @@ async def chatai(client: Client, message: types.Message) -> None:
                 await msg.reply_text(resp)
         except Exception as e:
             await msg.reply_text(str(e))
-        finally:
-            if photo_path:
-                try:
-                    await async_photo.unlink()
-                except Exception:
-                    pass
     else:
+        # Ask about the replied message when the command has no text
+        if not text and msg is not message:
+            text = msg.text or msg.caption or ""
+        if not text:
+            await message.reply_text("Send a question after the command.")
+            return
         try:
+            if config.gemini_stream:
+                reply = StreamedReply(message, interval=config.gemini_stream_interval)
+                await reply.consume(ai.send_stream(str(text)))
+                return
             resp = await ai.send(str(text))
             # Check if response exceeds 4000 characters
             if len(resp) > 4000:
@@ -1,8 +1,7 @@
 import html
 import logging
-import os
 import time
-import uuid
+from itertools import groupby
 from typing import List, Tuple
 
 from pyrogram import Client, filters
@@ -11,6 +10,7 @@ from pyrogram.types import (
     InlineKeyboardButton,
     InlineKeyboardMarkup,
     InlineQuery,
+    InlineQueryResultCachedAudio,
     InlineQueryResultPhoto,
     InputMediaAudio,
     Message,
@@ -20,55 +20,36 @@ from spotdl import Song
 from spotipy.exceptions import SpotifyException
 
 from delta import config
-from delta.core.database.music_db import add_music, get_music_by_url
+from delta.core.client_pool import upload_pool
+from delta.core.database.music_db import (
+    add_music,
+    get_music_by_url,
+    get_musics_by_urls,
+)
+from delta.core.database.playlist_db import (
+    get_playlist_subscription,
+    update_playlist_subscription,
+)
+from delta.core.database.stats_db import record_requests
+from delta.filters import owner_only
+from delta.helpers.archiver import archive_queue
+from delta.helpers.delivery import fetch_cached_audio, send_cached_audio
+from delta.helpers.music import (
+    build_song_caption,
+    download_and_prepare_song,
+    upload_files,
+    upload_to_log,
+)
+from delta.helpers.prefetch import prefetcher
 from delta.helpers.progress import progress_func
 from delta.utils import spotify
+from delta.utils.executors import pool_stats
+from delta.utils.spotify import DownloadJob, Track
+from delta.utils.token_store import callback_tokens
 
 logger = logging.getLogger("DeltaX")
 
 
-async def download_and_prepare_song(song: Song) -> Tuple[Song, str]:
-    try:
-        song, path = await spotify.download(song)
-        if not path:
-            raise Exception(f"Download failed for {song.display_name}")
-        return song, str(path)
-    except Exception as error:
-        raise error
-
-
-def build_song_caption(song: Song) -> str:
-    display_name = html.escape(getattr(song, "display_name", "Unknown Title"))
-    artist = html.escape(getattr(song, "artist", "Unknown Artist"))
-    album = html.escape(getattr(song, "album_name", "Unknown Album"))
-
-    # Convert duration from seconds to minutes and seconds
-    duration_val = getattr(song, "duration", None)
-    if duration_val is None or not str(duration_val).isdigit():
-        duration_str = "Unknown Duration"
-    else:
-        duration_seconds = int(duration_val)
-        minutes = duration_seconds // 60
-        seconds = duration_seconds % 60
-        duration_str = f"{minutes} min {seconds} sec"
-
-    explicit = getattr(song, "explicit", "No")
-    publisher = html.escape(getattr(song, "publisher", "Unknown Publisher"))
-    popularity = getattr(song, "popularity", "0")
-    year = getattr(song, "year", "0")
-    caption = (
-        f"<b>{display_name}</b>\n\n"
-        f'<pre language="Artist">{artist}</pre>\n'
-        f'<pre language="Album">{album}</pre>\n'
-        f'<pre language="Year">{year}</pre>\n'
-        f'<pre language="Duration">{duration_str}</pre>\n'
-        f'<pre language="Explicit">{explicit}</pre>\n'
-        f'<pre language="Popularity">{popularity}</pre>\n'
-        f'<pre language="Publisher">{publisher}</pre>\n'
-    )
-    return caption
-
-
 @Client.on_message(filters.command("spotdl"))
 async def spotdl_cmd(client: Client, message: Message) -> None:
     spotify_url = None
@@ -89,14 +70,41 @@ async def spotdl_cmd(client: Client, message: Message) -> None:
     # Split the message into the command and the query.
     parts = message.text.split(" ", 1)
     song_query = parts[1] if len(parts) > 1 else spotify_url
+    # "--all" re-delivers every track of an already synced playlist
+    full_sync = False
+    if song_query and "--all" in song_query.split():
+        full_sync = True
+        song_query = " ".join(w for w in song_query.split() if w != "--all")
     if not song_query:
         await message.reply_text("Please provide a Spotify link or search query.")
         return
     downloading_message = await message.reply_text(
         "Processing your request...\nThis may take a few minutes.", quote=True
     )
+
+    playlist_id = spotify.parse_playlist_id(song_query)
+    snapshot_id = None
+    delivered_ids: set[str] = set()
+    if playlist_id:
+        try:
+            snapshot_id = await spotify.playlist_snapshot(playlist_id)
+        except Exception as e:
+            logger.error(f"Error fetching snapshot of playlist {playlist_id}: {e}")
+        subscription = await get_playlist_subscription(message.chat.id, playlist_id)
+        if subscription and not full_sync:
+            if snapshot_id and subscription.snapshot_id == snapshot_id:
+                await downloading_message.edit_text(
+                    "Playlist has not changed since the last sync, no new tracks.\n"
+                    "Add <code>--all</code> to get every track again."
+                )
+                return
+            delivered_ids = set(subscription.track_ids or [])
     try:
-        songs: List[Song] = await spotify.search([song_query])
+        # Keep compact records for the whole job, full songs are rebuilt
+        # one at a time right before they are downloaded.
+        tracks: List[Track] = [
+            Track.from_song(song) for song in await spotify.search([song_query])
+        ]
     except SpotifyException:
         await downloading_message.edit_text(
             "Could not find or download music. Please try a different link."
@@ -107,106 +115,206 @@ async def spotdl_cmd(client: Client, message: Message) -> None:
             "An error occurred. Please check the link and try again."
         )
         return
+    if delivered_ids:
+        tracks = [track for track in tracks if track.id not in delivered_ids]
+        if not tracks:
+            await update_playlist_subscription(
+                message.chat.id, playlist_id, snapshot_id, []
+            )
+            await downloading_message.edit_text(
+                "No new tracks since the last sync.\n"
+                "Add <code>--all</code> to get every track again."
+            )
+            return
+    delivered_ids = set()
+    job = DownloadJob(name=f"{message.chat.id}:{message.id}")
     prev_message_id = message.id
-    for song in songs:
-        record = await get_music_by_url(song.url)
-        if record and record.message_id:
+
+    # Runs of cached tracks are sent in bulk, in their place in the list
+    records = await get_musics_by_urls([track.url for track in tracks])
+    cached = await fetch_cached_audio(client, records)
+    await record_requests(
+        hits=[track.url for track in tracks if track.url in cached],
+        misses=[track.url for track in tracks if track.url not in cached],
+    )
+
+    for is_cached, group in groupby(tracks, key=lambda track: track.url in cached):
+        group = list(group)
+        if is_cached:
+            sent_count, last_id = await send_cached_audio(
+                client,
+                message.chat.id,
+                [cached[track.url] for track in group],
+                reply_to_message_id=prev_message_id,
+            )
+            prev_message_id = last_id or prev_message_id
+            delivered_ids.update(track.id for track in group[:sent_count])
+            # Whatever could not be sent from the cache is downloaded again
+            group = group[sent_count:]
+        for track in group:
             try:
-                log_msg = await client.get_messages(
-                    config.channel_log, record.message_id
-                )
-                if log_msg and log_msg.audio:
-                    copied = await client.copy_message(
-                        chat_id=message.chat.id,
-                        from_chat_id=config.channel_log,
-                        message_id=log_msg.id,
-                        reply_parameters=ReplyParameters(message_id=prev_message_id),
+                song, path = await download_and_prepare_song(track, job)
+            except Exception as e:
+                logger.error(f"Error downloading {track.display_name}: {e}")
+                continue
+            # In user-first mode the audio goes straight to the user, the log
+            # channel copy and the cache record are written in the background
+            user_first = config.user_first_delivery
+            try:
+                caption = build_song_caption(song)
+                async with upload_files(song, path) as (audio, thumb):
+                    start_time = time.time()
+                    upload_args = dict(
+                        audio=audio,
+                        caption=caption,
+                        title=song.name,
+                        performer=song.artist,
+                        duration=int(song.duration),
+                        thumb=thumb,
+                        progress=progress_func,
+                        progress_args=(
+                            downloading_message,
+                            start_time,
+                            "upload",
+                            song.name,
+                        ),
                     )
-                    prev_message_id = copied.id
+                    if user_first:
+                        sent = await client.send_audio(
+                            chat_id=message.chat.id,
+                            reply_parameters=ReplyParameters(
+                                message_id=prev_message_id
+                            ),
+                            **upload_args,
+                        )
+                    else:
+                        _, sent = await upload_pool.send_audio(**upload_args)
+                if user_first:
+                    archive_queue.submit(client, sent, song.url)
+                    prev_message_id = sent.id
+                    delivered_ids.add(track.id)
                     continue
+                await add_music(message_id=sent.id, url=song.url, chat_id=sent.chat.id)
             except Exception as e:
-                logger.error(f"Error copying record for {song.display_name}: {e}")
-        try:
-            song_obj, path = await download_and_prepare_song(song)
-        except Exception as e:
-            logger.error(f"Error downloading {song.display_name}: {e}")
-            continue
-        try:
-            caption = build_song_caption(song)
-            thumb = await spotify.download_thumbnail(song)
-            start_time = time.time()
-            log_msg = await client.send_audio(
-                chat_id=config.channel_log,
-                audio=path,
-                caption=caption,
-                title=song.name,
-                performer=song.artist,
-                duration=int(song.duration),
-                thumb=thumb,
-                progress=progress_func,
-                progress_args=(downloading_message, start_time, "upload", song.name),
-            )
-            await add_music(message_id=log_msg.id, url=song.url)
-        except Exception as e:
-            logger.error(f"Error sending {song.display_name} to log channel: {e}")
-            continue
-        finally:
-            if os.path.exists(path):
-                os.remove(path)
-        try:
-            copied = await client.copy_message(
-                chat_id=message.chat.id,
-                from_chat_id=config.channel_log,
-                message_id=log_msg.id,
-                reply_parameters=ReplyParameters(message_id=prev_message_id),
-            )
-            prev_message_id = copied.id
-        except Exception as e:
-            logger.error(f"Error copying {song.display_name} to user: {e}")
+                logger.error(f"Error sending {song.display_name}: {e}")
+                continue
+            try:
+                copied = await client.copy_message(
+                    chat_id=message.chat.id,
+                    from_chat_id=sent.chat.id,
+                    message_id=sent.id,
+                    reply_parameters=ReplyParameters(message_id=prev_message_id),
+                )
+                prev_message_id = copied.id
+                delivered_ids.add(track.id)
+            except Exception as e:
+                logger.error(f"Error copying {song.display_name} to user: {e}")
+    if playlist_id:
+        # Keep the snapshot only when everything arrived so failed tracks are
+        # retried on the next run
+        complete = len(delivered_ids) == len(tracks)
+        await update_playlist_subscription(
+            message.chat.id,
+            playlist_id,
+            snapshot_id if complete else None,
+            delivered_ids,
+        )
+    if job.failures:
+        logger.warning(
+            "Job %s finished with %d error(s): %s",
+            job.name,
+            len(job.errors),
+            dict(job.failures),
+        )
     await downloading_message.delete()
 
 
+@Client.on_message(owner_only & filters.command("dlstats"))
+async def download_stats_cmd(client: Client, message: Message) -> None:
+    stats = spotify.downloader.error_stats.snapshot(limit=5)
+    counters = "\n".join(
+        f"{html.escape(name)}: {count}" for name, count in stats["counters"].items()
+    )
+    retries = ", ".join(f"{name} {count}" for name, count in stats["retries"].items())
+    recent = "\n".join(
+        f"[{time.strftime('%H:%M:%S', time.localtime(ts))}] {html.escape(error)}"
+        for ts, _, error in stats["recent"]
+    )
+    tokens = callback_tokens.stats()
+    api = spotify.limiter.snapshot()
+    pools = "\n".join(
+        f"{name}: {p['active']}/{p['workers']} busy, {p['queued']} queued, "
+        f"avg {p['avg_utilization']:.0%}, wait {p['avg_wait']:.2f}s"
+        for name, p in pool_stats().items()
+    )
+    await message.reply_text(
+        f"<b>Download errors:</b> {stats['total']}\n\n"
+        f"<b>By class</b>\n<pre>{counters or 'None'}</pre>\n"
+        f"<b>Retries:</b> {retries or 'None'}\n"
+        f"<b>Recent</b>\n<pre>{recent or 'None'}</pre>\n"
+        f"<b>Spotify API:</b> {api['per_minute']:.0f} req/min, "
+        f"{api['requests']} sent, {api['coalesced']} coalesced, "
+        f"{api['throttled']} throttled, {api['rate_limited']} rate limited"
+        + (f", cooling down {api['cooldown']:.0f}s" if api["cooldown"] else "")
+        + "\n"
+        f"<b>Executors</b>\n<pre>{pools}</pre>\n"
+        f"<b>Callback tokens:</b> {tokens['size']}/{tokens['maxsize']}, "
+        f"hits {tokens['hits']}, misses {tokens['misses']}, "
+        f"evicted {tokens['evictions']}, expired {tokens['expirations']}",
+        quote=True,
+    )
+
+
 async def download_and_check_song(client: Client, msg, song: Song) -> Tuple[str, str]:
     record = await get_music_by_url(song.url)
     if record and record.message_id:
         try:
-            log_msg = await client.get_messages(config.channel_log, record.message_id)
+            log_msg = await client.get_messages(
+                record.chat_id or config.channel_log, record.message_id
+            )
             if log_msg and log_msg.audio:
+                await record_requests(hits=[song.url])
                 caption = build_song_caption(song)
                 return log_msg.audio.file_id, caption
         except Exception as e:
             logger.error(f"Error retrieving cached song for {song.url}: {e}")
+    await record_requests(misses=[song.url])
     song_obj, path = await download_and_prepare_song(song)
     caption = build_song_caption(song)
-    thumb = await spotify.download_thumbnail(song)
     try:
-        log_msg = await client.send_audio(
-            chat_id=config.channel_log,
-            audio=path,
-            caption=caption,
-            title=song.name,
-            performer=song.artist,
-            duration=int(song.duration),
-            thumb=thumb,
-            progress=progress_func,
-            progress_args=(msg, start_time, "upload", song.name),
-        )
-
-        await add_music(message_id=log_msg.id, url=song.url)
+        # Inline callbacks have no message to report progress on
+        uploader, log_msg = await upload_to_log(song, path, msg)
+        if uploader is not client:
+            # file_ids are bound to the bot, fetch the message as the main bot
+            log_msg = await client.get_messages(log_msg.chat.id, log_msg.id)
     except Exception as e:
         logger.error(f"Error sending {song.display_name} to log channel: {e}")
         raise e
-    finally:
-        if os.path.exists(path):
-            os.remove(path)
-            os.remove(thumb)
     return log_msg.audio.file_id, caption
 
 
+async def prefetch_song(client: Client, song: Song) -> None:
+    # Speculative fetches are not user requests, keep them out of the stats
+    record = await get_music_by_url(song.url)
+    if record and record.message_id:
+        return
+    song, path = await spotify.prefetch(song)
+    if not path:
+        raise Exception(f"Download failed for {song.display_name}")
+    await upload_to_log(song, str(path))
+
+
 @Client.on_callback_query(filters.regex(r"^spotdl\|[0-9a-fA-F]{8}$"))
 async def callback_download_handler(client: Client, callback_query: CallbackQuery):
-    song_url = client.message_cache.store.get(callback_query.data)
+    song_url = await callback_tokens.get(callback_query.data)
+    if not song_url:
+        await callback_query.answer(
+            "This result has expired, please search again.", show_alert=True
+        )
+        return
     await callback_query.edit_message_text("**Download in progress...**")
+    # A speculative prefetch may already be filling the cache for this track
+    await prefetcher.wait_for(song_url)
     try:
         await callback_query.edit_message_text("Downloading ....")
         songs = await spotify.search([song_url])
@@ -259,17 +367,44 @@ async def inline_query_handler(client: Client, inline_query: InlineQuery):
             caption="Not found",
         )
         return await inline_query.answer([result], cache_time=0)
+    # Tracks already in the cache are answered with their file_id directly
+    try:
+        records = await get_musics_by_urls([song.url for song in songs if song.url])
+        cached = await fetch_cached_audio(client, records)
+    except Exception as e:
+        logger.error(f"Error checking cache for inline query {query!r}: {e}")
+        cached = {}
+    if config.prefetch_enabled and inline_query.from_user:
+        top = next(
+            (song for song in songs if song.url and song.url not in cached), None
+        )
+        if top:
+            prefetcher.schedule(
+                inline_query.from_user.id,
+                top.url,
+                lambda: prefetch_song(client, top),
+            )
     results = []
     for song in songs:
         song_url = getattr(song, "url", "") or ""
         display_name = getattr(song, "display_name", "Unknown Title") or "Unknown Title"
         artist = getattr(song, "artist", "Unknown Artist") or "Unknown Artist"
         cover_url = getattr(song, "cover_url", "") or ""
+        cached_msg = cached.get(song_url)
+        if cached_msg:
+            results.append(
+                InlineQueryResultCachedAudio(
+                    audio_file_id=cached_msg.audio.file_id,
+                    id=song_url,
+                    caption=cached_msg.caption or "",
+                    caption_entities=cached_msg.caption_entities,
+                )
+            )
+            continue
         if not song_url or not cover_url:
             continue
 
-        cb_data = "spotdl|" + str(uuid.uuid4()).split("-")[0]
-        client.message_cache.store.update({cb_data: song_url})
+        cb_data = callback_tokens.put(song_url)
         result = InlineQueryResultPhoto(
             id=song_url,
             photo_url=cover_url,
@@ -6,25 +6,29 @@ import git
 from pyrogram import Client, filters, types
 
 from delta.core.database.system_db import update_system
+from delta.utils.executors import misc_pool
+
+
+def update_repository() -> None:
+    try:
+        repo = git.Repo()
+        origin = repo.remotes.origin
+        origin.pull()
+    except git.exc.InvalidGitRepositoryError:
+        repo = git.Repo.init()
+        origin = repo.create_remote(
+            "origin", "https://github.com/troublescope/DeltaxBot.git"
+        )
+        origin.fetch()
+        repo.create_head("main", origin.refs.master)
+        repo.heads.master.set_tracking_branch(origin.refs.master)
+        repo.heads.master.checkout(True)
 
 
 @Client.on_message(filters.command("restart"))
 async def restart_handler(client: Client, message: types.Message):
     if len(message.command) > 1 and message.command[1].lower() == "update":
-        try:
-            repo = git.Repo()
-            origin = repo.remotes.origin
-            origin.pull()
-        except git.exc.InvalidGitRepositoryError:
-            repo = git.Repo.init()
-            origin = repo.create_remote(
-                "origin", "https://github.com/troublescope/DeltaxBot.git"
-            )
-            origin.fetch()
-            repo.create_head("main", origin.refs.master)
-            repo.heads.master.set_tracking_branch(origin.refs.master)
-            repo.heads.master.checkout(True)
-
+        await misc_pool.run(update_repository)
         restart_msg = await message.reply("Repository updated. Restarting bot...")
     else:
         restart_msg = await message.reply("**Restarting bot...**")
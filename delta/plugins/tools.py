@@ -21,6 +21,7 @@ from pyrogram.types import (
 )
 
 from delta.filters import owner_only
+from delta.helpers.eval_worker import EvalTimeout, eval_worker
 from delta.utils import gemini_chat, upload_cdn
 
 # Global persistent dictionary for storing variables between eval calls.
@@ -33,6 +34,11 @@ TASKS = {}
 BUTTON_ABORT = [[InlineKeyboardButton("Abort", callback_data="btn_abort")]]
 BUTTON_RERUN = [[InlineKeyboardButton("Refresh", callback_data="btn_rerun")]]
 
+# Commands evaluated in the worker process instead of the event loop.
+WORKER_COMMANDS = {"pe", "peval"}
+# Seconds between edits showing the output of a running worker eval.
+STREAM_INTERVAL = 1.5
+
 
 @Client.on_callback_query(owner_only & filters.regex(r"^btn_"))
 async def evaluate_handler_(client: Client, callback_query: CallbackQuery) -> None:
@@ -44,7 +50,7 @@ async def evaluate_handler_(client: Client, callback_query: CallbackQuery) -> No
     reply_message = await client.get_messages(chat_id, callback_query.message.id)
     if cmd == "rerun":
         _id_ = f"{chat_id} - {message.id}"
-        task = asyncio.create_task(async_evaluate_func(client, message, reply_message))
+        task = asyncio.create_task(evaluate(client, message, reply_message))
         TASKS[_id_] = task
         try:
             await task
@@ -59,7 +65,7 @@ async def evaluate_handler_(client: Client, callback_query: CallbackQuery) -> No
         cancel_task(task_id=f"{chat_id} - {message.id}")
 
 
-@Client.on_message(owner_only & filters.command(["e", "eval"]))
+@Client.on_message(owner_only & filters.command(["e", "eval", "pe", "peval"]))
 async def evaluate_handler(client: Client, message: Message) -> None:
     if len(message.command) == 1:
         await message.reply_text(
@@ -72,7 +78,7 @@ async def evaluate_handler(client: Client, message: Message) -> None:
         "...", quote=True, reply_markup=InlineKeyboardMarkup(BUTTON_ABORT)
     )
     _id_ = f"{message.chat.id} - {message.id}"
-    task = asyncio.create_task(async_evaluate_func(client, message, reply_message))
+    task = asyncio.create_task(evaluate(client, message, reply_message))
     TASKS[_id_] = task
     try:
         await task
@@ -238,6 +244,67 @@ async def async_evaluate_func(
         if key not in ephemeral_keys:
             var_dict[key] = value
 
+    await send_eval_output(reply_message, print_out, converted_time)
+
+
+async def worker_evaluate_func(
+    client: Client, message: Message, reply_message: Message
+) -> None:
+    await reply_message.edit_text(
+        "<b>Executing...</b>", reply_markup=InlineKeyboardMarkup(BUTTON_ABORT)
+    )
+    if len(message.text.split()) == 1:
+        await reply_message.edit_text(
+            "<b>No Code!</b>", reply_markup=InlineKeyboardMarkup(BUTTON_RERUN)
+        )
+        return
+
+    eval_code = message.text.split(maxsplit=1)[1]
+    if eval_code.strip() == "--reset":
+        await eval_worker.kill()
+        await reply_message.edit_text(
+            "<b>Worker reset!</b>", reply_markup=InlineKeyboardMarkup(BUTTON_RERUN)
+        )
+        return
+
+    last_edit = client.loop.time()
+
+    async def show_output(output: str) -> None:
+        nonlocal last_edit
+        if client.loop.time() - last_edit < STREAM_INTERVAL:
+            return
+        last_edit = client.loop.time()
+        with contextlib.suppress(pyrogram.errors.RPCError):
+            await reply_message.edit_text(
+                f"<pre>{html.escape(output[-3500:])}</pre>",
+                reply_markup=InlineKeyboardMarkup(BUTTON_ABORT),
+            )
+
+    start_time = client.loop.time()
+    try:
+        output, error = await eval_worker.run(eval_code, show_output)
+    except EvalTimeout as e:
+        output, error = e.output, str(e)
+    except RuntimeError as e:
+        output, error = "", str(e)
+    except asyncio.TimeoutError:
+        output, error = "", "Eval worker failed to start: timed out"
+    print_out = (output + (error or "")).strip() or "None"
+    converted_time = fmt_secs(client.loop.time() - start_time)
+    await send_eval_output(reply_message, print_out, converted_time)
+
+
+async def evaluate(client: Client, message: Message, reply_message: Message) -> None:
+    command = message.text.split(maxsplit=1)[0][1:].split("@")[0].lower()
+    if command in WORKER_COMMANDS:
+        await worker_evaluate_func(client, message, reply_message)
+    else:
+        await async_evaluate_func(client, message, reply_message)
+
+
+async def send_eval_output(
+    reply_message: Message, print_out: str, converted_time: str
+) -> None:
     final_output = (
         f"<pre>{html.escape(print_out)}</pre>\n<b>Elapsed:</b> {converted_time}"
     )
@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+from delta import config
+
+T = TypeVar("T")
+
+
+class WorkerPool:
+    """
+    Named thread pool for one class of blocking work.
+
+    Each workload class gets its own pool so a burst in one of them, such as
+    a playlist of downloads, can not starve the others. Queue depth and
+    utilization are tracked for diagnostics.
+    """
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=f"delta-{name}"
+        )
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.busy_time = 0.0
+        self.wait_time = 0.0
+        self._created = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking function in the pool.
+
+        Args:
+            func: Function to run
+            *args: Positional arguments for the function
+            **kwargs: Keyword arguments for the function
+
+        Returns:
+            Result of the function
+        """
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, func, *args, **kwargs)
+        with self._lock:
+            self.queued += 1
+        future = self.executor.submit(self._measure, call, time.monotonic())
+        future.add_done_callback(self._dequeue_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _dequeue_cancelled(self, future: Future) -> None:
+        # Jobs cancelled before they started never reach _measure
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def _measure(self, call: Callable[[], T], submitted: float) -> T:
+        started = time.monotonic()
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+            self.wait_time += started - submitted
+        try:
+            return call()
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.busy_time += time.monotonic() - started
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            uptime = time.monotonic() - self._created
+            return {
+                "workers": self.max_workers,
+                "queued": self.queued,
+                "active": self.active,
+                "completed": self.completed,
+                "utilization": self.active / self.max_workers,
+                "avg_utilization": (
+                    self.busy_time / (uptime * self.max_workers) if uptime else 0.0
+                ),
+                "avg_wait": self.wait_time / self.completed if self.completed else 0.0,
+            }
+
+
+# yt-dlp downloads and conversions
+download_pool = WorkerPool("download", config.download_workers)
+# spotdl searches and Spotify Web API calls
+metadata_pool = WorkerPool("metadata", config.metadata_workers)
+# Pillow decoding and thumbnails
+image_pool = WorkerPool("image", config.image_workers)
+# Anything else, such as playlist files and git
+misc_pool = WorkerPool("misc", config.misc_workers)
+# Speculative downloads, kept off the workers of real downloads
+prefetch_pool = WorkerPool("prefetch", config.prefetch_max_active)
+
+POOLS: Dict[str, WorkerPool] = {
+    pool.name: pool
+    for pool in (download_pool, metadata_pool, image_pool, misc_pool, prefetch_pool)
+}
+
+
+def pool_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Return the statistics of every pool.
+
+    Returns:
+        Dictionary of pool name to its statistics
+    """
+    return {name: pool.stats() for name, pool in POOLS.items()}
@@ -1,17 +1,44 @@
 import asyncio
+import io
+import logging
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional, TypeVar, Union, cast
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from google import genai
 from google.genai import types
-from google.genai.types import GenerateContentConfig, GoogleSearch, Tool
+from google.genai.types import GenerateContentConfig, Tool
 from PIL import Image
 
 from delta import config
+from delta.core.database.gemini_db import (
+    delete_chat_history,
+    get_chat_history,
+    save_chat_history,
+)
+from delta.utils.executors import image_pool
+from delta.utils.gemini_pool import GeminiClientPool, gemini_pool
+from delta.utils.gemini_router import EXPLICIT, Route, model_router
+from delta.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger("DeltaX")
 
 # Define types for better type hinting
 T = TypeVar("T")
-ImageType = Union[str, Image.Image]
+ImageType = Union[str, bytes, Image.Image]
 
 SYSTEM_INSTRUCTION = """You are a friendly and helpful assistant.
 Provide complete answers unless the user requests a concise response. Keep simple answers short.
@@ -27,6 +54,99 @@ If people are present, mention their actions or expressions.
 Keep the response short and clear.
 Respond to all non-English queries in the same language as the user's query unless instructed otherwise."""
 
+# Answers to stateless requests: image descriptions and first chat turns
+response_cache: Optional[TTLCache[tuple, Tuple[str, types.Content]]] = (
+    TTLCache(maxsize=config.gemini_cache_size, ttl=config.gemini_cache_ttl)
+    if config.gemini_cache_size > 0
+    else None
+)
+
+SUMMARY_PROMPT = """Update the summary of a conversation between a user and an assistant.
+Keep names, facts, preferences and open questions the assistant may need later. Be brief.
+
+Current summary:
+{summary}
+
+New messages:
+{transcript}
+
+Updated summary:"""
+
+ALBUM_PROMPT = """Analyze the given images together and provide one brief combined summary.
+Describe what they show as a set, noting what they have in common and how they differ.
+Mention visible text and, if people are present, their actions or expressions.
+Keep the response short and clear.
+Respond to all non-English queries in the same language as the user's query unless instructed otherwise."""
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    """
+    Estimate the number of tokens of a list of contents.
+
+    Args:
+        contents: Contents to measure
+
+    Returns:
+        Estimated token count, about four characters per token
+    """
+    return sum(
+        len(part.text or "") // 4 + 1
+        for content in contents
+        for part in content.parts or []
+    )
+
+
+class HistoryStats:
+    """
+    Size of the history sent with each chat request.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.total_tokens = 0
+        self.max_tokens = 0
+        self.compactions = 0
+        self.summaries = 0
+        self.dropped_turns = 0
+
+    def record(self, tokens: int) -> None:
+        self.requests += 1
+        self.total_tokens += tokens
+        self.max_tokens = max(self.max_tokens, tokens)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "avg_tokens": self.total_tokens / self.requests if self.requests else 0.0,
+            "max_tokens": self.max_tokens,
+            "compactions": self.compactions,
+            "summaries": self.summaries,
+            "dropped_turns": self.dropped_turns,
+        }
+
+
+history_stats = HistoryStats()
+
+
+def prepare_image(data: bytes, max_size: int, quality: int = 85) -> bytes:
+    """
+    Downscale and re-encode an image to a JPEG Gemini can use as is.
+
+    Args:
+        data: Encoded image
+        max_size: Maximum width and height
+        quality: JPEG quality
+
+    Returns:
+        Encoded JPEG image
+    """
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert("RGB")
+        img.thumbnail((max_size, max_size))
+        output = io.BytesIO()
+        img.save(output, format="JPEG", quality=quality)
+    return output.getvalue()
+
 
 def error_handler(func: Callable[..., T]) -> Callable[..., T]:
     @wraps(func)
@@ -50,32 +170,126 @@ class GeminiAIChat:
         project: Optional[str] = None,
         location: Optional[str] = None,
         http_options: Optional[Dict[str, Any]] = None,
+        history: Optional[List[types.Content]] = None,
+        pool: Optional[GeminiClientPool] = None,
+        summary: Optional[str] = None,
+        history_budget: Optional[int] = None,
     ):
-        if vertexai and (not project or not location):
-            raise ValueError("Project and location are required when using Vertex AI")
-        if not vertexai and not api_key:
-            raise ValueError("API key is required when not using Vertex AI")
-        if vertexai:
-            self.client = genai.Client(
-                vertexai=True,
-                project=project,
-                location=location,
-                http_options=http_options,
-            )
-        else:
-            self.client = genai.Client(api_key=api_key, http_options=http_options)
+        if pool is None:
+            if vertexai and (not project or not location):
+                raise ValueError(
+                    "Project and location are required when using Vertex AI"
+                )
+            if not vertexai and not api_key:
+                raise ValueError("API key is required when not using Vertex AI")
+            if vertexai:
+                pool = GeminiClientPool(
+                    [
+                        (
+                            "vertexai",
+                            genai.Client(
+                                vertexai=True,
+                                project=project,
+                                location=location,
+                                http_options=http_options,
+                            ),
+                        )
+                    ]
+                )
+            else:
+                pool = GeminiClientPool.from_keys([api_key], http_options)
+        self.pool = pool
         self.model = model
         self.instruction = instruction
-        self.chat = None
+        self.history: List[types.Content] = list(history or [])
+        self.summary = summary
+        self.history_budget = (
+            config.gemini_history_tokens if history_budget is None else history_budget
+        )
+        self.last_used = time.monotonic()
 
-    @error_handler
-    async def _create_chat(self) -> None:
-        cfg = (
-            types.GenerateContentConfig(system_instruction=self.instruction)
-            if self.instruction
-            else None
+    @property
+    def size(self) -> int:
+        """
+        Approximate size of the conversation history in characters.
+        """
+        return len(self.summary or "") + sum(
+            len(part.text or "")
+            for content in self.history
+            for part in content.parts or []
         )
-        self.chat = self.client.aio.chats.create(model=self.model, config=cfg)
+
+    @property
+    def history_tokens(self) -> int:
+        """
+        Estimated number of tokens the history adds to a request.
+        """
+        return estimate_tokens(self.history) + len(self.summary or "") // 4
+
+    def dump_history(self) -> List[Dict[str, Any]]:
+        """
+        Serialize the conversation history to JSON compatible dictionaries.
+
+        Returns:
+            List of serialized contents
+        """
+        return [
+            content.model_dump(mode="json", exclude_none=True)
+            for content in self.history
+        ]
+
+    @staticmethod
+    def load_history(data: List[Dict[str, Any]]) -> List[types.Content]:
+        """
+        Rebuild a conversation history serialized with dump_history.
+
+        Args:
+            data: List of serialized contents
+
+        Returns:
+            List of contents
+        """
+        return [types.Content.model_validate(item) for item in data or []]
+
+    def _config(
+        self,
+        tools: Optional[List[Tool]],
+        temperature: float,
+        max_output_tokens: int,
+        with_summary: bool = False,
+    ) -> GenerateContentConfig:
+        instruction = self.instruction
+        if with_summary and self.summary:
+            instruction = (
+                f"{instruction or ''}\n\n"
+                f"Summary of the earlier conversation:\n{self.summary}"
+            ).strip()
+        return GenerateContentConfig(
+            system_instruction=instruction,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            tools=tools,
+        )
+
+    async def _generate(
+        self,
+        route: Route,
+        contents: List[Any],
+        cfg: GenerateContentConfig,
+        prompt: str,
+    ) -> types.GenerateContentResponse:
+        started = time.monotonic()
+        try:
+            response = await self.pool.call(
+                lambda client: client.aio.models.generate_content(
+                    model=route.model, contents=contents, config=cfg
+                )
+            )
+        except Exception:
+            model_router.record(route, time.monotonic() - started, prompt, ok=False)
+            raise
+        model_router.record(route, time.monotonic() - started, prompt, ok=True)
+        return response
 
     @error_handler
     async def send(
@@ -85,50 +299,207 @@ class GeminiAIChat:
         temperature: float = 0.9,
         max_output_tokens: int = 1024,
     ) -> str:
-        if not self.chat:
-            await self._create_chat()
-        if tools is None:
-            tools = [Tool(google_search=GoogleSearch())]
-        cfg = GenerateContentConfig(
-            system_instruction=self.instruction,
-            max_output_tokens=max_output_tokens,
-            temperature=temperature,
-            tools=tools,
+        await self._compact()
+        route = model_router.route(message, self.model, tools)
+        cfg = self._config(
+            route.tools, temperature, max_output_tokens, with_summary=True
         )
-        response = await self.chat.send_message(message, config=cfg)
+        content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+        history_stats.record(self.history_tokens)
+        cache_key = self._first_turn_key(message, route, temperature)
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached:
+            self.history.extend((content, cached[1]))
+            return cached[0]
+        response = await self._generate(route, [*self.history, content], cfg, message)
+        reply = self._add_turn(content, response)
+        if cache_key and reply and response.text:
+            response_cache.set(cache_key, (response.text, reply))
         return response.text
 
+    async def send_stream(
+        self,
+        message: str,
+        tools: Optional[List[Tool]] = None,
+        temperature: float = 0.9,
+        max_output_tokens: int = 1024,
+    ) -> AsyncIterator[str]:
+        """
+        Send a message and yield the response text as it is generated.
+
+        Args:
+            message: User message
+            tools: Tools the model may use, chosen by the router by default
+            temperature: Sampling temperature
+            max_output_tokens: Maximum length of the response
+
+        Yields:
+            Text chunks of the response
+        """
+        await self._compact()
+        route = model_router.route(message, self.model, tools)
+        cfg = self._config(
+            route.tools, temperature, max_output_tokens, with_summary=True
+        )
+        content = types.Content(role="user", parts=[types.Part.from_text(text=message)])
+        history_stats.record(self.history_tokens)
+        cache_key = self._first_turn_key(message, route, temperature)
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached:
+            self.history.extend((content, cached[1]))
+            yield cached[0]
+            return
+        text = ""
+        started = time.monotonic()
+        try:
+            async with self.pool.acquire() as key:
+                stream = await key.client.aio.models.generate_content_stream(
+                    model=route.model, contents=[*self.history, content], config=cfg
+                )
+                async for chunk in stream:
+                    if chunk.text:
+                        text += chunk.text
+                        yield chunk.text
+        except Exception:
+            model_router.record(route, time.monotonic() - started, message, ok=False)
+            raise
+        model_router.record(route, time.monotonic() - started, message, ok=True)
+        if text:
+            reply = types.Content(role="model", parts=[types.Part.from_text(text=text)])
+            self.history.extend((content, reply))
+            if cache_key:
+                response_cache.set(cache_key, (text, reply))
+
+    def _first_turn_key(
+        self, message: str, route: Route, temperature: float
+    ) -> Optional[tuple]:
+        # Only a first turn is independent of the conversation, and answers
+        # grounded in search are about facts that may change any minute
+        if (
+            response_cache is None
+            or self.history
+            or self.summary
+            or route.name == EXPLICIT
+            or route.search
+        ):
+            return None
+        normalized = " ".join(message.split()).casefold()
+        return ("send", normalized, route.model, self.instruction, temperature)
+
+    async def _compact(self) -> None:
+        """
+        Keep the history within the token budget.
+
+        The oldest turns are dropped until the history uses at most half of
+        the budget. With summarization enabled they are folded into a
+        rolling summary that is sent with the system instruction.
+        """
+        if not self.history_budget or self.history_tokens <= self.history_budget:
+            return
+        target = self.history_budget // 2
+        dropped: List[types.Content] = []
+        # Drop whole turns so the history still starts with a user message
+        while len(self.history) > 2 and estimate_tokens(self.history) > target:
+            dropped.extend(self.history[:2])
+            del self.history[:2]
+        if not dropped:
+            return
+        history_stats.compactions += 1
+        history_stats.dropped_turns += len(dropped) // 2
+        if not config.gemini_summarize:
+            return
+        try:
+            self.summary = await self._summarize(dropped)
+            history_stats.summaries += 1
+        except Exception as e:
+            logger.warning(f"Failed to summarize chat history: {e}")
+
+    async def _summarize(self, contents: List[types.Content]) -> str:
+        transcript = "\n".join(
+            f"{content.role}: {part.text}"
+            for content in contents
+            for part in content.parts or []
+            if part.text
+        )
+        prompt = SUMMARY_PROMPT.format(
+            summary=self.summary or "None", transcript=transcript
+        )
+        response = await self.pool.call(
+            lambda client: client.aio.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config=GenerateContentConfig(temperature=0.2, max_output_tokens=400),
+            )
+        )
+        return (response.text or "").strip() or self.summary
+
+    def _add_turn(
+        self, content: types.Content, response: types.GenerateContentResponse
+    ) -> Optional[types.Content]:
+        # Only keep turns the model answered, like the SDK chat session does
+        candidates = response.candidates or []
+        if not candidates or not candidates[0].content:
+            return None
+        self.history.append(content)
+        self.history.append(candidates[0].content)
+        return candidates[0].content
+
     @error_handler
     async def set_instruction(self, instruction: str) -> None:
         self.instruction = instruction
-        await self._create_chat()
+        self.history = []
+        self.summary = None
 
     @error_handler
     async def vision(
         self,
-        image: ImageType,
+        image: Union[
+            ImageType,
+            List[ImageType],
+            Callable[[], Awaitable[Union[ImageType, List[ImageType]]]],
+        ],
         prompt: str = IMAGE_PROMPT,
         tools: Optional[List[Tool]] = None,
         temperature: float = 0.1,
         max_output_tokens: int = 500,
+        image_id: Optional[str] = None,
     ) -> str:
-        loop = asyncio.get_running_loop()
-        image_obj = image
-        if isinstance(image, str):
-            image_obj = await loop.run_in_executor(None, self._open_image, image)
-        if tools is None:
-            tools = [Tool(google_search=GoogleSearch())]
-        cfg = GenerateContentConfig(
-            system_instruction=self.instruction,
-            max_output_tokens=max_output_tokens,
-            temperature=temperature,
-            tools=tools,
-        )
-        response = await self.client.aio.models.generate_content(
-            model=self.model, contents=[prompt, image_obj], config=cfg
+        route = model_router.route(prompt, self.model, tools, allow_light=False)
+        cache_key = (
+            ("vision", image_id, " ".join(prompt.split()), self.model, self.instruction)
+            if image_id
+            and response_cache is not None
+            and route.name != EXPLICIT
+            and not route.search
+            else None
         )
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached:
+            return cached[0]
+        if callable(image):
+            # Loaded only when the answer is not cached
+            image = await image()
+        images = image if isinstance(image, list) else [image]
+        # Several images, such as an album, are answered in a single request
+        image_objs = await asyncio.gather(*map(self._image_content, images))
+        cfg = self._config(route.tools, temperature, max_output_tokens)
+        response = await self._generate(route, [prompt, *image_objs], cfg, prompt)
+        if cache_key and response.text:
+            response_cache.set(cache_key, (response.text, None))
         return response.text
 
+    async def _image_content(self, image: ImageType) -> Any:
+        if isinstance(image, str):
+            return await image_pool.run(self._open_image, image)
+        if isinstance(image, bytes):
+            return types.Part.from_bytes(
+                data=await image_pool.run(
+                    prepare_image, image, config.gemini_image_size
+                ),
+                mime_type="image/jpeg",
+            )
+        return image
+
     def _open_image(self, image_path: str) -> Image.Image:
         try:
             with Image.open(image_path) as img:
@@ -140,14 +511,36 @@ class GeminiAIChat:
 
 
 class ChatManager:
-    def __init__(self):
-        self.user_chats: Dict[int, GeminiAIChat] = {}
+    """
+    Active chats kept in least recently used order.
+
+    The number of chats, their combined history size and their idle time
+    are bounded. Evicted chats are saved to the database and restored on
+    the user's next message, so memory stays flat without users losing
+    their conversation. Idle chats are also swept periodically once
+    ``start`` was called.
+    """
+
+    def __init__(self, max_chats: int, idle_timeout: float, memory_cap: int):
+        self.max_chats = max(1, max_chats)
+        self.idle_timeout = idle_timeout
+        self.memory_cap = memory_cap
+        self.user_chats: "OrderedDict[int, GeminiAIChat]" = OrderedDict()
+        self._saving: Dict[int, GeminiAIChat] = {}
+        self._save_tasks: Dict[int, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {
+            "created": 0,
+            "restored": 0,
+            "evicted": 0,
+            "saved": 0,
+        }
 
     @error_handler
     async def get_chat(
         self,
         user_id: int,
-        model: str = "gemini-2.0-flash",
+        model: Optional[str] = None,
         instruction: str = SYSTEM_INSTRUCTION,
         api_key: Optional[str] = None,
         vertexai: bool = False,
@@ -155,29 +548,121 @@ class ChatManager:
         location: Optional[str] = None,
         http_options: Optional[Dict[str, Any]] = None,
     ) -> GeminiAIChat:
-        if user_id not in self.user_chats:
-            if api_key is None:
-                api_key = config.gemini_api_key
-            if not api_key and not (vertexai and project and location):
+        record = None
+        chat = self.user_chats.get(user_id) or self._saving.get(user_id)
+        if chat is None:
+            record = await get_chat_history(user_id)
+            # Another message of the same user may have restored it meanwhile
+            chat = self.user_chats.get(user_id)
+        if chat is None:
+            # Chats share the key pool unless they bring their own credentials
+            pool = gemini_pool if api_key is None and not vertexai else None
+            if pool is not None and not pool:
                 raise ValueError(
                     "Either API key or Vertex AI credentials must be provided"
                 )
-            self.user_chats[user_id] = GeminiAIChat(
-                model=model,
-                instruction=instruction,
+            chat = GeminiAIChat(
+                model=model or config.gemini_model,
+                instruction=(
+                    record.instruction if record and record.instruction else instruction
+                ),
                 api_key=api_key,
                 vertexai=vertexai,
                 project=project,
                 location=location,
                 http_options=http_options,
+                history=GeminiAIChat.load_history(record.history) if record else None,
+                pool=pool,
+                summary=record.summary if record else None,
             )
-        return self.user_chats[user_id]
+            self.stats["restored" if record else "created"] += 1
+        self.user_chats[user_id] = chat
+        self.user_chats.move_to_end(user_id)
+        chat.last_used = time.monotonic()
+        self._evict()
+        return chat
 
-    async def remove_chat(self, user_id: int) -> bool:
-        if user_id in self.user_chats:
+    def start(self) -> None:
+        """
+        Start sweeping idle chats in the background.
+        """
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(min(max(self.idle_timeout / 2, 1), 300))
+            self._evict(keep=0)
+
+    def _evict(self, keep: int = 1) -> None:
+        now = time.monotonic()
+        total = sum(chat.size for chat in self.user_chats.values())
+        # The most recently used chat is the one being returned, keep it
+        while len(self.user_chats) > keep:
+            user_id, chat = next(iter(self.user_chats.items()))
+            if (
+                len(self.user_chats) <= self.max_chats
+                and total <= self.memory_cap
+                and now - chat.last_used <= self.idle_timeout
+            ):
+                break
             del self.user_chats[user_id]
-            return True
-        return False
+            total -= chat.size
+            self.stats["evicted"] += 1
+            if chat.history or chat.summary:
+                self._saving[user_id] = chat
+                self._save_tasks[user_id] = asyncio.create_task(
+                    self._save(user_id, chat)
+                )
+
+    async def _save(self, user_id: int, chat: GeminiAIChat) -> None:
+        try:
+            await save_chat_history(
+                user_id, chat.dump_history(), chat.instruction, chat.summary
+            )
+            self.stats["saved"] += 1
+        except Exception as e:
+            logger.error(f"Failed to save chat history of {user_id}: {e}")
+        finally:
+            if self._saving.get(user_id) is chat:
+                del self._saving[user_id]
+            if self._save_tasks.get(user_id) is asyncio.current_task():
+                del self._save_tasks[user_id]
+
+    async def remove_chat(self, user_id: int) -> bool:
+        chat = self.user_chats.pop(user_id, None) or self._saving.pop(user_id, None)
+        # A save still in flight would write the history back after the delete
+        task = self._save_tasks.pop(user_id, None)
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await delete_chat_history(user_id)
+        return chat is not None
+
+    async def flush(self) -> None:
+        """
+        Save every active chat, used on shutdown.
+        """
+        if self._sweeper:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+        for user_id, chat in list(self.user_chats.items()):
+            if chat.history or chat.summary:
+                await self._save(user_id, chat)
+        if self._save_tasks:
+            await asyncio.gather(*self._save_tasks.values(), return_exceptions=True)
+
+    def memory_stats(self) -> Dict[str, int]:
+        return {
+            **self.stats,
+            "active": len(self.user_chats),
+            "history_chars": sum(chat.size for chat in self.user_chats.values()),
+        }
 
 
-gemini_chat = ChatManager()
+gemini_chat = ChatManager(
+    max_chats=config.gemini_max_chats,
+    idle_timeout=config.gemini_chat_idle,
+    memory_cap=config.gemini_memory_cap,
+)
@@ -0,0 +1,227 @@
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from google import genai
+from google.genai import errors
+
+from delta import config
+
+logger = logging.getLogger("DeltaX")
+
+T = TypeVar("T")
+
+
+class KeyHealth:
+    """
+    Shared client of one API key and its recent health.
+    """
+
+    __slots__ = (
+        "name",
+        "client",
+        "inflight",
+        "requests",
+        "outcomes",
+        "strikes",
+        "cooldown_until",
+    )
+
+    def __init__(self, name: str, client: genai.Client):
+        self.name = name
+        self.client = client
+        self.inflight = 0
+        self.requests = 0
+        self.outcomes: Deque[bool] = deque(maxlen=20)
+        self.strikes = 0
+        self.cooldown_until = 0.0
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def cooling_down(self, now: float) -> bool:
+        return self.cooldown_until > now
+
+
+class GeminiClientPool:
+    """
+    One genai client per API key, shared by every chat.
+
+    Requests go to the healthiest key: keys cooling down after quota or
+    authentication errors are skipped, and the rest are ordered by requests
+    in flight and recent error rate. A request rejected for quota is retried
+    once on another key.
+    """
+
+    def __init__(
+        self,
+        clients: List[Tuple[str, genai.Client]],
+        base_cooldown: float = 30.0,
+        max_cooldown: float = 600.0,
+    ):
+        self.keys = [KeyHealth(name, client) for name, client in clients]
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+
+    @classmethod
+    def from_keys(
+        cls, keys: List[str], http_options: Optional[Dict[str, Any]] = None
+    ) -> "GeminiClientPool":
+        """
+        Create a pool with a client for every API key.
+
+        Args:
+            keys: Gemini API keys
+            http_options: Optional HTTP options of the clients
+
+        Returns:
+            Pool of clients
+        """
+        return cls(
+            [
+                (f"...{key[-4:]}", genai.Client(api_key=key, http_options=http_options))
+                for key in keys
+            ]
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.keys)
+
+    def pick(self, exclude: Optional[KeyHealth] = None) -> KeyHealth:
+        """
+        Return the healthiest key.
+
+        Args:
+            exclude: Key to avoid when another one is available
+
+        Returns:
+            Key to send the next request with
+
+        Raises:
+            ValueError: If the pool has no keys
+        """
+        if not self.keys:
+            raise ValueError("No Gemini API key configured")
+        now = time.monotonic()
+        candidates = [key for key in self.keys if key is not exclude] or self.keys
+        ready = [key for key in candidates if not key.cooling_down(now)]
+        if not ready:
+            # Everything is cooling down, use the key that recovers first
+            return min(candidates, key=lambda key: key.cooldown_until)
+        return min(ready, key=lambda key: (key.inflight, key.error_rate))
+
+    @asynccontextmanager
+    async def acquire(
+        self, exclude: Optional[KeyHealth] = None
+    ) -> AsyncIterator[KeyHealth]:
+        """
+        Borrow the healthiest key for one request and record its outcome.
+
+        Args:
+            exclude: Key to avoid when another one is available
+
+        Yields:
+            Key whose client should be used for the request
+        """
+        key = self.pick(exclude)
+        key.inflight += 1
+        key.requests += 1
+        try:
+            yield key
+        except Exception as e:
+            self._record_error(key, e)
+            raise
+        else:
+            key.strikes = 0
+            key.outcomes.append(True)
+        finally:
+            key.inflight -= 1
+
+    async def call(
+        self, func: Callable[[genai.Client], Awaitable[T]], retries: int = 1
+    ) -> T:
+        """
+        Run a request with the healthiest key, moving to another key on quota
+        errors.
+
+        Args:
+            func: Coroutine factory taking the client to use
+            retries: How many other keys to try after a quota error
+
+        Returns:
+            Result of the request
+        """
+        exclude = None
+        for attempt in range(retries + 1):
+            try:
+                async with self.acquire(exclude) as key:
+                    return await func(key.client)
+            except Exception as e:
+                if (
+                    attempt == retries
+                    or len(self.keys) < 2
+                    or not self._is_quota_error(e)
+                ):
+                    raise
+                exclude = key
+                logger.warning(f"Gemini key {key.name} is rate limited, retrying")
+
+    @staticmethod
+    def _is_quota_error(error: Exception) -> bool:
+        if isinstance(error, errors.APIError) and error.code == 429:
+            return True
+        message = str(error).lower()
+        return "resource_exhausted" in message or "quota" in message
+
+    def _record_error(self, key: KeyHealth, error: Exception) -> None:
+        if self._is_quota_error(error):
+            key.strikes += 1
+            cooldown = min(
+                self.max_cooldown, self.base_cooldown * 2 ** (key.strikes - 1)
+            )
+        elif isinstance(error, errors.APIError) and error.code in (401, 403):
+            # Invalid or suspended key
+            cooldown = self.max_cooldown
+        elif isinstance(error, errors.ServerError):
+            cooldown = 0.0
+        else:
+            # Bad requests are not the key's fault
+            return
+        key.outcomes.append(False)
+        if cooldown:
+            key.cooldown_until = time.monotonic() + cooldown
+            logger.warning(
+                f"Gemini key {key.name} cooling down for {cooldown:.0f}s: {error}"
+            )
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        return [
+            {
+                "key": key.name,
+                "inflight": key.inflight,
+                "requests": key.requests,
+                "error_rate": key.error_rate,
+                "cooldown": max(0.0, key.cooldown_until - now),
+            }
+            for key in self.keys
+        ]
+
+
+gemini_pool = GeminiClientPool.from_keys(config.gemini_api_keys)
@@ -0,0 +1,138 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+from google.genai.types import GoogleSearch, Tool
+
+from delta import config
+
+logger = logging.getLogger("DeltaX")
+
+LIGHT = "light"
+MAIN = "main"
+SEARCH = "search"
+EXPLICIT = "explicit"
+
+# Prompts that only make sense with up to date information
+FRESH_RE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|currently|current|latest|recent|"
+    r"news|this (week|month|year)|weather|forecast|price|stock|score|result|"
+    r"who won|release date|schedule|update|trending|20[2-9]\d)\b",
+    re.IGNORECASE,
+)
+URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+# Short conversational messages
+SMALL_TALK_RE = re.compile(
+    r"^\W*(hi|hii+|hello|hey|yo|hola|halo|ok|okay|thanks|thank you|thx|"
+    r"good (morning|night|evening|afternoon)|bye|lol|haha\w*|nice|cool|"
+    r"how are you|who are you|what'?s up)\W*$",
+    re.IGNORECASE,
+)
+
+
+class Route:
+    """
+    Model and tools chosen for one request.
+    """
+
+    __slots__ = ("name", "model", "tools")
+
+    def __init__(self, name: str, model: str, tools: Optional[List[Tool]] = None):
+        self.name = name
+        self.model = model
+        self.tools = tools
+
+    @property
+    def search(self) -> bool:
+        return any(tool.google_search for tool in self.tools or [])
+
+
+class ModelRouter:
+    """
+    Latency-tiered routing of Gemini requests.
+
+    Small talk and short prompts go to a lighter model without tools.
+    Search grounding is only attached when a prompt looks like it needs
+    fresh facts. Every other prompt uses the chat's model without search.
+    Decisions and latency per route are logged so the policy can be tuned.
+    """
+
+    def __init__(self, light_model: str, enabled: bool = True, short_words: int = 4):
+        self.light_model = light_model
+        self.enabled = enabled
+        self.short_words = short_words
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def route(
+        self,
+        prompt: str,
+        model: str,
+        tools: Optional[List[Tool]] = None,
+        allow_light: bool = True,
+    ) -> Route:
+        """
+        Choose the model and tools for a prompt.
+
+        Args:
+            prompt: User prompt
+            model: Main model of the chat
+            tools: Tools requested by the caller, which bypass the policy
+            allow_light: Whether the light model may be used
+
+        Returns:
+            Chosen route
+        """
+        if tools is not None:
+            return Route(EXPLICIT, model, tools)
+        search = [Tool(google_search=GoogleSearch())]
+        if not self.enabled:
+            return Route(SEARCH, model, search)
+        if FRESH_RE.search(prompt) or URL_RE.search(prompt):
+            return Route(SEARCH, model, search)
+        if allow_light and (
+            SMALL_TALK_RE.match(prompt) or len(prompt.split()) <= self.short_words
+        ):
+            return Route(LIGHT, self.light_model)
+        return Route(MAIN, model)
+
+    def record(self, route: Route, seconds: float, prompt: str, ok: bool) -> None:
+        """
+        Record the outcome of a routed request.
+
+        Args:
+            route: Route the request took
+            seconds: Latency of the request
+            prompt: User prompt
+            ok: Whether the request succeeded
+        """
+        stats = self.stats.setdefault(
+            route.name,
+            {"requests": 0, "errors": 0, "total": 0.0, "max": 0.0},
+        )
+        stats["requests"] += 1
+        stats["errors"] += 0 if ok else 1
+        stats["total"] += seconds
+        stats["max"] = max(stats["max"], seconds)
+        logger.info(
+            "Gemini route %s (%s, search=%s) for %d chars took %.2fs%s",
+            route.name,
+            route.model,
+            route.search,
+            len(prompt),
+            seconds,
+            "" if ok else " and failed",
+        )
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {
+                **stats,
+                "avg": stats["total"] / stats["requests"] if stats["requests"] else 0.0,
+            }
+            for name, stats in self.stats.items()
+        }
+
+
+model_router = ModelRouter(
+    light_model=config.gemini_light_model, enabled=config.gemini_routing
+)
@@ -2,9 +2,11 @@ from spotdl import Song
 from delta import config
 
 from .core import Spotify
+from .job import DownloadJob
+from .track import Track
 spotify = Spotify(
         client_id=config.spotify_id,
         client_secret=config.spotify_secret,
     )
 
-__all__ = ['spotify', 'Song']
+__all__ = ['spotify', 'Song', 'DownloadJob', 'Track']
@@ -0,0 +1,71 @@
+import logging
+from typing import Iterable, Set
+
+from delta.core.database.archive_db import (
+    add_archive_urls,
+    get_all_archived_urls,
+    get_archived_urls,
+)
+
+logger = logging.getLogger("DeltaX")
+
+
+class DownloadArchive:
+    """
+    Download archive stored in Postgres with an in-memory set in front of it.
+
+    The local set is preloaded with ``refresh`` at startup. Candidates that
+    are not in it are looked up in the database before every bulk run, so
+    rows written by other processes are always seen and several workers
+    can share one archive.
+    """
+
+    def __init__(self):
+        self._urls: Set[str] = set()
+
+    async def refresh(self) -> int:
+        """
+        Reload every archived URL into the local set.
+
+        Returns:
+            Number of archived URLs
+        """
+        self._urls = await get_all_archived_urls()
+        return len(self._urls)
+
+    async def archived(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Return which of the given URLs are archived.
+
+        Args:
+            urls: Song URLs to check
+
+        Returns:
+            Set of the archived URLs
+        """
+        urls = set(urls)
+        unknown = urls - self._urls
+        if unknown:
+            found = await get_archived_urls(unknown)
+            self._urls.update(found)
+            logger.debug("Loaded %d archived urls", len(found))
+        return urls & self._urls
+
+    async def add(self, urls: Iterable[str]) -> None:
+        """
+        Append URLs to the archive.
+
+        Args:
+            urls: Song URLs to archive
+        """
+        new_urls = {url for url in urls if url not in self._urls}
+        if not new_urls:
+            return
+        await add_archive_urls(new_urls)
+        self._urls.update(new_urls)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._urls
+
+    def __len__(self) -> int:
+        return len(self._urls)
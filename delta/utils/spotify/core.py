@@ -1,15 +1,28 @@
+import asyncio
+import io
 import os
-from typing import List, Optional, Tuple
+import re
+from typing import List, Optional, Tuple, Union
 
 import aiohttp
 from aiopath import AsyncPath
-from asyncer import asyncify
+from PIL import Image
 from spotdl import DownloaderOptions, Song
 from spotdl.utils.search import get_search_results as _get_search_results
 from spotdl.utils.search import parse_query
 from spotdl.utils.spotify import SpotifyClient
 
+from delta import config
+from delta.utils.executors import image_pool, metadata_pool
+
 from .downloader import Downloader
+from .job import DownloadJob
+from .ratelimit import SpotifyRateLimiter
+from .track import Track
+
+PLAYLIST_URL_RE = re.compile(
+    r"open\.spotify\.com/(?:intl-[a-z]+/)?playlist/([A-Za-z0-9]+)"
+)
 
 
 class Spotify:
@@ -35,6 +48,13 @@ class Spotify:
         SpotifyClient.init(
             client_id=client_id, client_secret=client_secret, no_cache=True
         )
+        # Every job shares one request budget and backs off together on 429
+        self.limiter = SpotifyRateLimiter(
+            rate=config.spotify_rate,
+            burst=config.spotify_burst,
+            max_retries=config.spotify_max_retries,
+        )
+        self.limiter.install(SpotifyClient())
         self.downloader = Downloader(settings)
 
     async def search(self, query: List[str]) -> List[Song]:
@@ -47,7 +67,8 @@ class Spotify:
         Returns:
             List of Song objects matching the queries
         """
-        return await asyncify(parse_query)(
+        return await metadata_pool.run(
+            parse_query,
             query=query,
             threads=self.downloader.settings["threads"],
             use_ytm_data=self.downloader.settings["ytm_data"],
@@ -68,19 +89,65 @@ class Spotify:
         Returns:
             List of Song objects matching the query
         """
-        return await asyncify(_get_search_results)(query)
+        return await metadata_pool.run(_get_search_results, query)
 
-    async def download(self, song: Song) -> Tuple[Song, Optional[AsyncPath]]:
+    @staticmethod
+    def parse_playlist_id(query: str) -> Optional[str]:
+        """
+        Extract the playlist ID from a Spotify playlist URL.
+
+        Args:
+            query: Search query or URL
+
+        Returns:
+            Playlist ID, or None if the query is not a playlist URL
+        """
+        match = PLAYLIST_URL_RE.search(query)
+        return match.group(1) if match else None
+
+    async def playlist_snapshot(self, playlist_id: str) -> Optional[str]:
+        """
+        Fetch the current snapshot ID of a playlist in a single request.
+
+        Args:
+            playlist_id: Spotify playlist ID
+
+        Returns:
+            Snapshot ID of the playlist, or None if Spotify did not return one
+        """
+        playlist = await metadata_pool.run(
+            SpotifyClient().playlist, playlist_id, fields="snapshot_id"
+        )
+        return (playlist or {}).get("snapshot_id")
+
+    async def download(
+        self, song: Union[Song, Track], job: Optional[DownloadJob] = None
+    ) -> Tuple[Song, Optional[AsyncPath]]:
         """
         Download the specified song asynchronously.
 
         Args:
-            song: Song object to download
+            song: Song object or compact track record to download
+            job: Optional job the download errors are recorded in
+
+        Returns:
+            Tuple containing the Song object and path to the downloaded file (or None if download failed)
+        """
+        return await self.downloader.download_song(song, job)
+
+    async def prefetch(
+        self, song: Union[Song, Track]
+    ) -> Tuple[Song, Optional[AsyncPath]]:
+        """
+        Download the specified song speculatively, at low priority.
+
+        Args:
+            song: Song object or compact track record to download
 
         Returns:
             Tuple containing the Song object and path to the downloaded file (or None if download failed)
         """
-        return await self.downloader.download_song(song)
+        return await self.downloader.prefetch_song(song)
 
     async def download_thumbnail(self, song: Song, output_dir: str = "") -> str:
         """
@@ -127,3 +194,46 @@ class Spotify:
             raise Exception("Thumbnail download timed out")
         except Exception as e:
             raise Exception(f"Error downloading thumbnail: {str(e)}")
+
+    async def download_thumbnail_bytes(
+        self, song: Song, size: int = 320, quality: int = 85
+    ) -> io.BytesIO:
+        """
+        Download the song cover into memory as a Telegram-ready JPEG thumbnail.
+
+        Args:
+            song: Song object containing the cover URL
+            size: Maximum width and height of the thumbnail
+            quality: JPEG quality of the re-encoded thumbnail
+
+        Returns:
+            In-memory JPEG thumbnail
+
+        Raises:
+            Exception: If thumbnail download fails
+        """
+        if not song.cover_url:
+            raise ValueError("Song does not have a cover URL")
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(song.cover_url, timeout=30) as response:
+                    response.raise_for_status()
+                    data = await response.read()
+        except aiohttp.ClientError as e:
+            raise Exception(f"Failed to download thumbnail: {str(e)}")
+        except asyncio.TimeoutError:
+            raise Exception("Thumbnail download timed out")
+
+        return await image_pool.run(self._make_thumbnail, data, size, quality)
+
+    @staticmethod
+    def _make_thumbnail(data: bytes, size: int, quality: int) -> io.BytesIO:
+        with Image.open(io.BytesIO(data)) as img:
+            img = img.convert("RGB")
+            img.thumbnail((size, size))
+            thumb = io.BytesIO()
+            img.save(thumb, format="JPEG", quality=quality)
+        thumb.name = "thumb.jpg"
+        thumb.seek(0)
+        return thumb
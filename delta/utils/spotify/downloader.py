@@ -2,10 +2,11 @@ import asyncio
 import json
 import logging
 from asyncio import Semaphore
+from collections import Counter
 from datetime import datetime
+from pathlib import Path
 
 from aiopath import AsyncPath
-from asyncer import asyncify
 from spotdl import DownloaderOptions, Song
 from spotdl.download.downloader import Downloader as BaseDownloader
 from spotdl.utils.config import DOWNLOADER_OPTIONS
@@ -13,6 +14,12 @@ from spotdl.utils.m3u import gen_m3u_files
 from spotdl.utils.search import songs_from_albums
 
 from delta import config
+from delta.utils.executors import WorkerPool, download_pool, misc_pool, prefetch_pool
+
+from .archive import DownloadArchive
+from .job import DownloadJob, ErrorSink, ErrorStats
+from .retry import DEFAULT_POLICIES, NETWORK, classify_error
+from .track import Track
 
 logger = logging.getLogger("DeltaX")
 
@@ -38,20 +45,37 @@ class Downloader(BaseDownloader):
         cookie_path = AsyncPath("data/cookies.txt")
         bundle_settings["cookie_file"] = str(cookie_path)
         bundle_settings["bitrate"] = 0
+        # --continue resumes the .part file left behind by a failed attempt
         bundle_settings["yt_dlp_args"] = (
             f"--format bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best --extractor-args youtube:cookie={str(cookie_path)}"
+            " --continue --fragment-retries 10"
         )
 
+        # The archive lives in the database, keep spotdl away from the file
+        archive_enabled = bool(bundle_settings["archive"]) or config.download_archive
+        bundle_settings["archive"] = None
+
         super().__init__(bundle_settings)
 
+        self.archive = DownloadArchive() if archive_enabled else None
+
+        # spotdl keeps every error of the process in one list, route them to
+        # the job that caused them and keep only bounded statistics here.
+        self.error_stats = ErrorStats(config.download_error_history)
+        self.errors = ErrorSink(self.error_stats)
+
         self.semaphore = Semaphore(5)
+        self.retry_policies = dict(DEFAULT_POLICIES)
 
-    async def download_song(self, song: Song) -> tuple[Song, AsyncPath | None]:
+    async def download_song(
+        self, song: Song | Track, job: DownloadJob | None = None
+    ) -> tuple[Song, AsyncPath | None]:
         """
         Download a single song.
 
         ### Arguments
-        - song: The song to download.
+        - song: The song or compact track record to download.
+        - job: The job to record errors in, a new one is created if omitted.
 
         ### Returns
         - tuple with the song and the path to the downloaded file if successful.
@@ -59,24 +83,37 @@ class Downloader(BaseDownloader):
 
         self.progress_handler.set_song_count(1)
 
-        return (await self.download_multiple_songs([song]))[0]
+        # An explicit request must be able to fetch an archived song again
+        results = await self.download_multiple_songs([song], job, use_archive=False)
+        return results[0] if results else (song, None)
 
     async def download_multiple_songs(
-        self, songs: list[Song]
+        self,
+        songs: list[Song | Track],
+        job: DownloadJob | None = None,
+        use_archive: bool = True,
     ) -> list[tuple[Song, AsyncPath | None]]:
         """
         Download multiple songs to the temp directory.
 
         ### Arguments
-        - songs: The songs to download.
+        - songs: The songs or compact track records to download.
+        - job: The job to record errors in, a new one is created if omitted.
+        - use_archive: Whether to skip songs that are already in the archive.
 
         ### Returns
         - list of tuples with the song and the path to the downloaded file if successful.
         """
 
+        if job is None:
+            job = DownloadJob()
+        errors_before = len(job.errors)
+
         if self.settings["fetch_albums"]:
             raw_albums: list[str] = [
-                song.album_id for song in songs if song.album_id is not None
+                song.album_id
+                for song in songs
+                if getattr(song, "album_id", None) is not None
             ]
             albums: set[str] = set(raw_albums)
 
@@ -89,45 +126,45 @@ class Downloader(BaseDownloader):
 
         logger.debug("Downloading %d songs", len(songs))
 
-        if self.settings["archive"]:
-            songs = [song for song in songs if song.url not in self.url_archive]
+        if self.archive is not None and use_archive:
+            archived = await self.archive.archived(song.url for song in songs)
+            songs = [song for song in songs if song.url not in archived]
             logger.debug("Filtered %d songs with archive", len(songs))
 
         self.progress_handler.set_song_count(len(songs))
 
         results: list[tuple[Song, AsyncPath | None]] = await asyncio.gather(
-            *[self.search_and_download(song) for song in songs]
+            *[self.search_and_download(song, job) for song in songs]
         )
 
+        # Only report the errors raised by this call
+        errors = job.errors[errors_before:]
+
         if self.settings["print_errors"]:
-            for error in self.errors:
-                logger.error(error)
+            for error in errors:
+                logger.error("[job %s] %s", job.name, error)
 
         if self.settings["save_errors"]:
 
             error_path = AsyncPath(self.settings["save_errors"])
             async with await error_path.open("a") as error_file:
-                if len(self.errors) > 0:
+                if len(errors) > 0:
                     await error_file.write(
-                        f'{datetime.now().strftime("%Y-%m-%d-%H-%M-%S")}\n'
+                        f'{datetime.now().strftime("%Y-%m-%d-%H-%M-%S")} job {job.name}\n'
                     )
 
-                for error in self.errors:
+                for error in errors:
                     await error_file.write(f"{error}\n")
 
             logger.info("Saved errors to %s", self.settings["save_errors"])
 
-        if self.settings["archive"]:
-            for result in results:
-                if result[1] or self.settings["add_unavailable"]:
-                    self.url_archive.add(result[0].url)
-
-            await self.url_archive.async_save(self.settings["archive"])
-            logger.info(
-                "Saved archive with %d urls to %s",
-                len(self.url_archive),
-                self.settings["archive"],
+        if self.archive is not None:
+            await self.archive.add(
+                result[0].url
+                for result in results
+                if result[1] or self.settings["add_unavailable"]
             )
+            logger.info("Archive knows %d urls", len(self.archive))
 
         if self.settings["m3u"]:
             song_list = [
@@ -139,7 +176,8 @@ class Downloader(BaseDownloader):
             # Note: If gen_m3u_files doesn't support AsyncPath, you might need to modify it
             # or convert AsyncPath to str before passing
             [(song, str(path) if path else None) for song, path in results]
-            await asyncify(gen_m3u_files)(
+            await misc_pool.run(
+                gen_m3u_files,
                 song_list,
                 self.settings["m3u"],
                 self.settings["output"],
@@ -165,20 +203,105 @@ class Downloader(BaseDownloader):
 
         return results
 
-    async def search_and_download(self, song: Song) -> tuple[Song, AsyncPath | None]:
+    async def search_and_download(
+        self, song: Song | Track, job: DownloadJob | None = None
+    ) -> tuple[Song, AsyncPath | None]:
         """
         Search for the song and download it.
 
         ### Arguments
-        - song: The song to download.
+        - song: The song to download, track records are rehydrated first.
+        - job: The job to record errors in.
+
+        ### Notes
+        - Failed attempts are retried with the policy of their error class,
+          attempts without a file or an error use the network policy.
+        - Errors are only recorded in the job once the last attempt failed.
 
         ### Returns
         - tuple with the song and the path to the downloaded file if successful.
         """
 
-        async with self.semaphore:
-            result = await asyncify(super().search_and_download)(song)
-            # Convert Path to AsyncPath if a path was returned
+        if job is None:
+            job = DownloadJob()
+        retries: Counter = Counter()
+
+        while True:
+            # Errors of a single attempt, kept apart until the song gave up
+            attempt = DownloadJob(job.name)
+            async with self.semaphore:
+                result = await self._attempt(song, attempt)
             if result[1]:
                 return (result[0], AsyncPath(result[1]))
-            return (result[0], None)
+
+            # Retry according to the class of the error this attempt raised,
+            # an attempt that failed without reporting why counts as transient
+            if attempt.errors:
+                error_class = classify_error(attempt.errors[-1])
+            else:
+                attempt.record(f"{song.url} - download produced no file")
+                error_class = NETWORK
+            policy = self.retry_policies.get(error_class)
+            if policy is None or retries[error_class] >= policy.attempts:
+                for message in attempt.errors:
+                    job.record(message)
+                    self.error_stats.record(message, job)
+                return (result[0], None)
+            retries[error_class] += 1
+            self.error_stats.record_retry(error_class)
+            delay = policy.delay(retries[error_class])
+            logger.warning(
+                "Retrying %s after %s error in %.1fs (%d/%d)",
+                song.display_name,
+                error_class,
+                delay,
+                retries[error_class],
+                policy.attempts,
+            )
+            await asyncio.sleep(delay)
+
+    async def prefetch_song(self, song: Song | Track) -> tuple[Song, AsyncPath | None]:
+        """
+        Download a song speculatively.
+
+        ### Arguments
+        - song: The song or compact track record to download.
+
+        ### Notes
+        - Runs a single attempt on the prefetch pool, without a download slot
+          or retries, and its errors are not counted in the statistics.
+
+        ### Returns
+        - tuple with the song and the path to the downloaded file if successful.
+        """
+
+        song, path = await self._attempt(song, DownloadJob("prefetch"), prefetch_pool)
+        return (song, AsyncPath(path) if path else None)
+
+    async def _attempt(
+        self, song: Song | Track, job: DownloadJob, pool: WorkerPool = download_pool
+    ) -> tuple[Song, Path | None]:
+        """
+        Make one download attempt, building the Song of track records first.
+        """
+
+        if isinstance(song, Track):
+            song = song.to_song()
+
+        return await pool.run(self._search_and_download_for_job, song, job)
+
+    def _search_and_download_for_job(
+        self, song: Song, job: DownloadJob | None
+    ) -> tuple[Song, Path | None]:
+        """
+        Run spotdl's blocking search_and_download with errors bound to the job.
+        """
+
+        if job is None:
+            return super().search_and_download(song)
+
+        self.errors.bind(job, song.url)
+        try:
+            return super().search_and_download(song)
+        finally:
+            self.errors.unbind(song.url)
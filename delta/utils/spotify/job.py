@@ -0,0 +1,169 @@
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def failure_class(message: str) -> str:
+    """
+    Extract the failure class from a spotdl error message.
+
+    spotdl formats download failures as ``"<url> - <ExceptionClass>: <detail>"``,
+    anything else is reported as ``"Unknown"``.
+
+    Args:
+        message: Error message produced by spotdl
+
+    Returns:
+        Name of the exception class that caused the failure
+    """
+    _, sep, detail = message.partition(" - ")
+    if sep:
+        name, sep, _ = detail.partition(":")
+        name = name.strip()
+        if sep and name.isidentifier():
+            return name
+    return "Unknown"
+
+
+class DownloadJob:
+    """
+    Error accounting scoped to a single download request.
+    """
+
+    def __init__(self, name: Optional[str] = None):
+        self.id = uuid.uuid4().hex[:8]
+        self.name = name or self.id
+        self.created_at = time.time()
+        self.errors: List[str] = []
+        self.failures: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, message: str) -> None:
+        with self._lock:
+            self.errors.append(message)
+            self.failures[failure_class(message)] += 1
+
+    def errors_for(self, url: str) -> List[str]:
+        """
+        Return the errors recorded for the given song URL.
+
+        Args:
+            url: Song URL
+
+        Returns:
+            List of error messages that start with the URL
+        """
+        with self._lock:
+            return [error for error in self.errors if error.startswith(f"{url} - ")]
+
+    def __repr__(self) -> str:
+        return f"<DownloadJob {self.name} errors={len(self.errors)}>"
+
+
+class ErrorStats:
+    """
+    Process-wide download error statistics: a bounded ring of recent
+    failures and aggregated counters per failure class.
+    """
+
+    def __init__(self, history_size: int = 100):
+        self.recent: Deque[Tuple[float, Optional[str], str]] = deque(
+            maxlen=max(1, history_size)
+        )
+        self.counters: Counter = Counter()
+        self.retries: Counter = Counter()
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def record(self, message: str, job: Optional[DownloadJob] = None) -> None:
+        with self._lock:
+            self.recent.append((time.time(), job.id if job else None, message))
+            self.counters[failure_class(message)] += 1
+            self.total += 1
+
+    def record_retry(self, error_class: str) -> None:
+        with self._lock:
+            self.retries[error_class] += 1
+
+    def snapshot(self, limit: int = 10) -> Dict[str, object]:
+        """
+        Return a copy of the current statistics.
+
+        Args:
+            limit: Maximum number of recent failures to include
+
+        Returns:
+            Dictionary with the total, counters per class and recent failures
+        """
+        with self._lock:
+            recent = list(self.recent)[-limit:] if limit > 0 else []
+            return {
+                "total": self.total,
+                "counters": dict(self.counters.most_common()),
+                "retries": dict(self.retries),
+                "recent": recent,
+            }
+
+
+class ErrorSink(list):
+    """
+    Drop-in replacement for spotdl's ``Downloader.errors`` list.
+
+    Appended errors are never kept on the shared downloader. They are routed
+    to the job bound to the worker thread that reports them, or to a job
+    downloading the failing URL when the thread has none. Errors without a
+    job are counted in the process-wide ``ErrorStats`` right away, job
+    errors are counted by the downloader once the song has failed for good.
+    """
+
+    def __init__(self, stats: ErrorStats):
+        super().__init__()
+        self.stats = stats
+        self._local = threading.local()
+        self._jobs_by_url: Dict[str, List[DownloadJob]] = {}
+        self._lock = threading.Lock()
+
+    def bind(self, job: DownloadJob, url: Optional[str] = None) -> None:
+        self._local.job = job
+        if url:
+            with self._lock:
+                self._jobs_by_url.setdefault(url, []).append(job)
+
+    def unbind(self, url: Optional[str] = None) -> None:
+        job = getattr(self._local, "job", None)
+        self._local.job = None
+        if url and job:
+            with self._lock:
+                jobs = self._jobs_by_url.get(url, [])
+                if job in jobs:
+                    jobs.remove(job)
+                if not jobs:
+                    self._jobs_by_url.pop(url, None)
+
+    def _job_for(self, message: str) -> Optional[DownloadJob]:
+        # spotdl reports errors on the thread running the download, so the
+        # job bound there is exact even when several jobs fetch one URL
+        job = getattr(self._local, "job", None)
+        if job:
+            return job
+        url, sep, _ = message.partition(" - ")
+        if sep:
+            with self._lock:
+                jobs = self._jobs_by_url.get(url)
+                if jobs:
+                    return jobs[0]
+        return None
+
+    def append(self, message: str) -> None:
+        message = str(message)
+        job = self._job_for(message)
+        if job:
+            job.record(message)
+        else:
+            self.stats.record(message)
+
+    def extend(self, messages) -> None:
+        for message in messages:
+            self.append(message)
@@ -0,0 +1,193 @@
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict
+
+from spotipy.exceptions import SpotifyException
+
+logger = logging.getLogger("DeltaX")
+
+
+class SpotifyRateLimiter:
+    """
+    Coordinates every Spotify Web API call made by the process.
+
+    spotdl calls the shared spotipy client from many worker threads. This
+    layer sits in front of the client's HTTP calls and gives all of them a
+    single token bucket, a shared cooldown taken from the Retry-After header
+    of a 429 response, and coalescing of identical GET requests that are
+    already in flight.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_retries: int = 3,
+        default_retry_after: float = 5.0,
+    ):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._cooldown_until = 0.0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._sent: Deque[float] = deque()
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "coalesced": 0,
+            "throttled": 0,
+            "rate_limited": 0,
+        }
+
+    def install(self, client: Any) -> None:
+        """
+        Route the HTTP calls of a spotipy client through the limiter.
+
+        Args:
+            client: spotipy client instance, usually spotdl's SpotifyClient
+        """
+        if getattr(client, "_rate_limiter", None) is self:
+            return
+        # 429s are handled here for all callers at once, not per thread
+        client.status_forcelist = tuple(
+            code for code in client.status_forcelist if code != 429
+        )
+        client._build_session()
+        call = client._internal_call
+        client._internal_call = lambda method, url, payload, params: self.call(
+            call, method, url, payload, params
+        )
+        client._rate_limiter = self
+
+    def call(
+        self,
+        call: Callable[..., Any],
+        method: str,
+        url: str,
+        payload: Any,
+        params: Dict[str, Any],
+    ) -> Any:
+        """
+        Run one API call, sharing the result with identical in-flight GETs.
+
+        Args:
+            call: Original spotipy ``_internal_call``
+            method: HTTP method
+            url: Endpoint URL
+            payload: Request body
+            params: Query parameters
+
+        Returns:
+            Decoded JSON response
+        """
+        if method != "GET":
+            return self._send(call, method, url, payload, params)
+
+        key = json.dumps([url, params, payload], sort_keys=True, default=str)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+
+        try:
+            result = self._send(call, method, url, payload, params)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _send(
+        self,
+        call: Callable[..., Any],
+        method: str,
+        url: str,
+        payload: Any,
+        params: Dict[str, Any],
+    ) -> Any:
+        attempt = 0
+        while True:
+            self._acquire()
+            try:
+                return call(method, url, payload, dict(params))
+            except SpotifyException as exc:
+                if exc.http_status != 429 or attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                self._cool_down(exc)
+
+    def _acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._cooldown_until - now
+                if wait <= 0:
+                    self._tokens = min(
+                        self.burst, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        self._sent.append(now)
+                        self._prune(now)
+                        self.stats["requests"] += 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                self.stats["throttled"] += 1
+            time.sleep(wait)
+
+    def _cool_down(self, exc: SpotifyException) -> None:
+        headers = exc.headers or {}
+        try:
+            retry_after = float(headers.get("Retry-After", self.default_retry_after))
+        except (TypeError, ValueError):
+            retry_after = self.default_retry_after
+        with self._lock:
+            self.stats["rate_limited"] += 1
+            until = time.monotonic() + retry_after
+            if until > self._cooldown_until:
+                self._cooldown_until = until
+                # Start again from an empty bucket once the cooldown ends
+                self._tokens = 0.0
+                self._updated = until
+                logger.warning(
+                    "Spotify rate limit hit, pausing API calls for %.0fs", retry_after
+                )
+
+    def _prune(self, now: float) -> None:
+        while self._sent and now - self._sent[0] > 60:
+            self._sent.popleft()
+
+    def snapshot(self) -> Dict[str, float]:
+        """
+        Return counters and the current request rate.
+
+        Returns:
+            Dictionary with the counters, the requests sent in the last
+            minute, in-flight requests and the remaining cooldown in seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            return {
+                **self.stats,
+                "per_minute": len(self._sent),
+                "inflight": len(self._inflight),
+                "cooldown": max(0.0, self._cooldown_until - now),
+            }
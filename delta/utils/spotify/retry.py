@@ -0,0 +1,81 @@
+import random
+from typing import Dict, Optional
+
+from .job import failure_class
+
+RATE_LIMIT = "rate_limit"
+NETWORK = "network"
+PROVIDER = "provider"
+
+RATE_LIMIT_MARKERS = ("429", "too many requests", "rate limit", "rate-limit")
+NETWORK_CLASSES = {
+    "AudioProviderError",
+    "ConnectionError",
+    "ConnectionResetError",
+    "DownloadError",
+    "HTTPError",
+    "IncompleteRead",
+    "ProtocolError",
+    "ReadTimeout",
+    "SSLError",
+    "Timeout",
+    "TimeoutError",
+    "URLError",
+}
+NETWORK_MARKERS = ("timed out", "connection", "temporarily", "failed to get metadata")
+PROVIDER_CLASSES = {"LookupError"}
+
+
+class RetryPolicy:
+    """
+    Retry budget and jittered exponential backoff for one failure class.
+    """
+
+    def __init__(self, attempts: int, base_delay: float, max_delay: float):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt: int) -> float:
+        """
+        Return the delay before the given retry, using full jitter.
+
+        Args:
+            attempt: Retry number, starting at 1
+
+        Returns:
+            Seconds to wait
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(ceiling / 2, ceiling)
+
+
+DEFAULT_POLICIES: Dict[str, RetryPolicy] = {
+    # Transient hiccups, yt-dlp resumes the .part file on the next attempt
+    NETWORK: RetryPolicy(attempts=4, base_delay=2.0, max_delay=30.0),
+    RATE_LIMIT: RetryPolicy(attempts=3, base_delay=15.0, max_delay=120.0),
+    # Search results vary between calls, one more try is usually enough
+    PROVIDER: RetryPolicy(attempts=1, base_delay=5.0, max_delay=5.0),
+}
+
+
+def classify_error(message: str) -> Optional[str]:
+    """
+    Map a spotdl error message to a retryable failure class.
+
+    Args:
+        message: Error message produced by spotdl
+
+    Returns:
+        One of "network", "rate_limit" or "provider", or None when the
+        error is not worth retrying
+    """
+    lowered = message.lower()
+    if any(marker in lowered for marker in RATE_LIMIT_MARKERS):
+        return RATE_LIMIT
+    name = failure_class(message)
+    if name in PROVIDER_CLASSES:
+        return PROVIDER
+    if name in NETWORK_CLASSES or any(marker in lowered for marker in NETWORK_MARKERS):
+        return NETWORK
+    return None
@@ -0,0 +1,165 @@
+from typing import Any, Dict, Optional, Tuple
+
+from spotdl import Song
+
+
+class Track:
+    """
+    Compact track record kept for queued songs.
+
+    Holds the metadata spotdl needs to search, download and tag a song, the
+    full spotdl ``Song`` is built with ``to_song`` right before the song is
+    downloaded.
+    """
+
+    __slots__ = (
+        "id",
+        "url",
+        "isrc",
+        "name",
+        "artist",
+        "artists",
+        "duration",
+        "cover_url",
+        "album_id",
+        "album_name",
+        "album_artist",
+        "date",
+        "year",
+        "track_number",
+        "tracks_count",
+        "disc_number",
+        "disc_count",
+        "explicit",
+        "genres",
+        "publisher",
+        "copyright_text",
+        "download_url",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        url: str,
+        name: str,
+        artist: str,
+        duration: int = 0,
+        isrc: Optional[str] = None,
+        cover_url: Optional[str] = None,
+        artists: Tuple[str, ...] = (),
+        album_id: Optional[str] = None,
+        album_name: str = "",
+        album_artist: str = "",
+        date: str = "",
+        year: int = 0,
+        track_number: int = 1,
+        tracks_count: int = 1,
+        disc_number: int = 1,
+        disc_count: int = 1,
+        explicit: bool = False,
+        genres: Tuple[str, ...] = (),
+        publisher: str = "",
+        copyright_text: Optional[str] = None,
+        download_url: Optional[str] = None,
+    ):
+        self.id = id
+        self.url = url
+        self.isrc = isrc
+        self.name = name
+        self.artist = artist
+        self.artists = artists or (artist,)
+        self.duration = duration
+        self.cover_url = cover_url
+        self.album_id = album_id
+        self.album_name = album_name
+        self.album_artist = album_artist
+        self.date = date
+        self.year = year
+        self.track_number = track_number
+        self.tracks_count = tracks_count
+        self.disc_number = disc_number
+        self.disc_count = disc_count
+        self.explicit = explicit
+        self.genres = genres
+        self.publisher = publisher
+        self.copyright_text = copyright_text
+        self.download_url = download_url
+
+    @classmethod
+    def from_song(cls, song: Song) -> "Track":
+        """
+        Create a compact record from a full spotdl Song.
+
+        Args:
+            song: Song object returned by a search
+
+        Returns:
+            Track holding the fields needed to download and tag the song
+        """
+        return cls(
+            id=song.song_id,
+            url=song.url,
+            name=song.name,
+            artist=song.artist,
+            duration=int(song.duration or 0),
+            isrc=song.isrc,
+            cover_url=song.cover_url,
+            artists=tuple(song.artists or ()),
+            album_id=song.album_id,
+            album_name=song.album_name,
+            album_artist=song.album_artist,
+            date=song.date,
+            year=song.year,
+            track_number=song.track_number,
+            tracks_count=song.tracks_count,
+            disc_number=song.disc_number,
+            disc_count=song.disc_count,
+            explicit=song.explicit,
+            genres=tuple(song.genres or ()),
+            publisher=song.publisher,
+            copyright_text=song.copyright_text,
+            download_url=song.download_url,
+        )
+
+    def to_song(self) -> Song:
+        """
+        Build the full Song from the stored fields, without any API call.
+
+        Returns:
+            Song object with the metadata of the track
+        """
+        return Song(
+            name=self.name,
+            artists=list(self.artists),
+            artist=self.artist,
+            genres=list(self.genres),
+            disc_number=self.disc_number,
+            disc_count=self.disc_count,
+            album_name=self.album_name,
+            album_artist=self.album_artist,
+            duration=self.duration,
+            year=self.year,
+            date=self.date,
+            track_number=self.track_number,
+            tracks_count=self.tracks_count,
+            song_id=self.id,
+            explicit=self.explicit,
+            publisher=self.publisher,
+            url=self.url,
+            isrc=self.isrc,
+            cover_url=self.cover_url,
+            copyright_text=self.copyright_text,
+            download_url=self.download_url,
+            album_id=self.album_id,
+        )
+
+    @property
+    def display_name(self) -> str:
+        return f"{self.artist} - {self.name}"
+
+    @property
+    def json(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"<Track {self.id} {self.display_name!r}>"
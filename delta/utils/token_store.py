@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import secrets
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Set
+
+from delta import config
+from delta.core.database.token_db import add_token, delete_expired_tokens, get_token
+
+from .ttl_cache import TTLCache
+
+logger = logging.getLogger("DeltaX")
+
+
+class TokenStore:
+    """
+    Bounded, TTL-expiring store mapping short callback tokens to values.
+
+    Tokens look like ``<prefix>|<8 hex>`` so they fit in callback data. The
+    hex part is kept as an int key to stay compact. With ``persist`` enabled
+    every token is mirrored to Postgres and looked up there on a local miss,
+    so buttons keep working across restarts.
+    """
+
+    def __init__(self, prefix: str, maxsize: int, ttl: float, persist: bool = False):
+        self.prefix = prefix
+        self.persist = persist
+        self.cache: TTLCache[int, str] = TTLCache(maxsize, ttl)
+        self.db_hits = 0
+        self._writes = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def _key(self, token: str) -> Optional[int]:
+        prefix, sep, hex_part = token.partition("|")
+        if prefix != self.prefix or not sep:
+            return None
+        try:
+            return int(hex_part, 16)
+        except ValueError:
+            return None
+
+    def put(self, value: str) -> str:
+        """
+        Store a value and return a new token for it.
+
+        Args:
+            value: Value to store, e.g. a song URL
+
+        Returns:
+            Callback token
+        """
+        key = secrets.randbits(32)
+        token = f"{self.prefix}|{key:08x}"
+        self.cache.set(key, value)
+        if self.persist:
+            expires_at = datetime.utcnow() + timedelta(seconds=self.cache.ttl)
+            self._spawn(self._mirror(token, value, expires_at))
+        return token
+
+    async def get(self, token: str) -> Optional[str]:
+        """
+        Resolve a token to its value.
+
+        Args:
+            token: Callback token
+
+        Returns:
+            Stored value, or None if the token is unknown or expired
+        """
+        key = self._key(token)
+        if key is None:
+            return None
+        value = self.cache.get(key)
+        if value is not None or not self.persist:
+            return value
+        try:
+            record = await get_token(token)
+        except Exception as e:
+            logger.error(f"Error loading callback token {token}: {e}")
+            return None
+        if record is None:
+            return None
+        self.db_hits += 1
+        remaining = (record.expires_at - datetime.utcnow()).total_seconds()
+        self.cache.set(key, record.value, ttl=max(remaining, 0))
+        return record.value
+
+    def stats(self) -> Dict[str, float]:
+        return {**self.cache.stats(), "db_hits": self.db_hits}
+
+    async def _mirror(self, token: str, value: str, expires_at: datetime) -> None:
+        try:
+            await add_token(token, value, expires_at)
+            self._writes += 1
+            if self._writes % 500 == 0:
+                await delete_expired_tokens()
+        except Exception as e:
+            logger.error(f"Error persisting callback token {token}: {e}")
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+callback_tokens = TokenStore(
+    "spotdl",
+    maxsize=config.callback_token_max,
+    ttl=config.callback_token_ttl,
+    persist=config.callback_token_persist,
+)
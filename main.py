@@ -16,6 +16,7 @@ from colorlog import ColoredFormatter
 
 from delta import deltabot
 from delta.core import init_db
+from delta.utils import spotify
 
 
 def setup_logging():
@@ -75,6 +76,11 @@ async def shutdown(loop):
 async def main():
     try:
         await init_db()
+        if spotify.downloader.archive is not None:
+            await spotify.downloader.archive.refresh()
+            logger.info(
+                "Loaded download archive with %d urls", len(spotify.downloader.archive)
+            )
         logger.info("Starting bot client")
         await deltabot.start()
         logger.info("Application started successfully")
@@ -0,0 +1,36 @@
+import asyncio
+
+from delta.utils import spotify
+from delta.utils.spotify import DownloadJob, Track
+from delta.utils.spotify.job import ErrorStats
+from delta.utils.spotify.retry import NETWORK, RetryPolicy
+
+URL = "https://open.spotify.com/track/x"
+
+
+def test_attempt_without_file_or_error_is_retried_and_reported(monkeypatch):
+    downloader = spotify.downloader
+    track = Track(id="x", url=URL, name="Song", artist="Artist")
+    attempts = []
+
+    async def attempt(song, job):
+        attempts.append(job)
+        return (song, None)
+
+    monkeypatch.setattr(downloader, "_attempt", attempt)
+    monkeypatch.setattr(downloader, "error_stats", ErrorStats())
+    monkeypatch.setattr(
+        downloader,
+        "retry_policies",
+        {NETWORK: RetryPolicy(attempts=2, base_delay=0.0, max_delay=0.0)},
+    )
+    job = DownloadJob("test")
+
+    song, path = asyncio.run(downloader.search_and_download(track, job))
+
+    assert path is None
+    assert len(attempts) == 3
+    assert job.errors == [f"{URL} - download produced no file"]
+    stats = downloader.error_stats.snapshot()
+    assert stats["total"] == 1
+    assert stats["retries"] == {NETWORK: 2}
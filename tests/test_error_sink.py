@@ -0,0 +1,50 @@
+import threading
+
+from delta.utils.spotify.job import DownloadJob, ErrorSink, ErrorStats
+
+URL = "https://open.spotify.com/track/x"
+
+
+def test_concurrent_jobs_on_one_url_keep_their_errors():
+    sink = ErrorSink(ErrorStats())
+    job_a, job_b = DownloadJob("a"), DownloadJob("b")
+    a_bound, b_bound, a_failed = threading.Event(), threading.Event(), threading.Event()
+
+    def download_a():
+        sink.bind(job_a, URL)
+        a_bound.set()
+        # Job B starts on the same URL before job A fails
+        b_bound.wait()
+        sink.append(f"{URL} - ConnectionError: reset")
+        a_failed.set()
+        sink.unbind(URL)
+
+    def download_b():
+        a_bound.wait()
+        sink.bind(job_b, URL)
+        b_bound.set()
+        a_failed.wait()
+        sink.unbind(URL)
+
+    threads = [threading.Thread(target=download_a), threading.Thread(target=download_b)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert job_a.errors == [f"{URL} - ConnectionError: reset"]
+    assert job_b.errors == []
+
+
+def test_unbound_thread_falls_back_to_the_url():
+    stats = ErrorStats()
+    sink = ErrorSink(stats)
+    job = DownloadJob("a")
+    sink.bind(job, URL)
+    thread = threading.Thread(target=sink.append, args=(f"{URL} - Error: boom",))
+    thread.start()
+    thread.join()
+    sink.unbind(URL)
+
+    assert job.errors == [f"{URL} - Error: boom"]
+    assert stats.total == 0
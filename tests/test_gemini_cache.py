@@ -0,0 +1,57 @@
+import asyncio
+
+from google.genai import types
+
+from delta.utils import gemini
+from delta.utils.gemini import GeminiAIChat
+from delta.utils.gemini_pool import gemini_pool
+from delta.utils.ttl_cache import TTLCache
+
+
+def ask_twice(monkeypatch, prompt):
+    calls = []
+
+    async def generate(self, route, contents, cfg, prompt):
+        calls.append(route)
+        return types.GenerateContentResponse(
+            candidates=[
+                types.Candidate(
+                    content=types.Content(
+                        role="model",
+                        parts=[types.Part.from_text(text=f"answer {len(calls)}")],
+                    )
+                )
+            ]
+        )
+
+    monkeypatch.setattr(gemini, "response_cache", TTLCache(maxsize=16, ttl=1800))
+    monkeypatch.setattr(GeminiAIChat, "_generate", generate)
+
+    async def run():
+        answers = []
+        # Two users asking the same first question
+        for _ in range(2):
+            chat = GeminiAIChat(model="test-model", pool=gemini_pool)
+            answers.append(await chat.send(prompt))
+        return answers
+
+    return asyncio.run(run()), calls
+
+
+def test_search_routed_prompt_is_not_served_from_cache(monkeypatch):
+    answers, calls = ask_twice(
+        monkeypatch, "What is the latest news about the election?"
+    )
+
+    assert all(route.search for route in calls)
+    assert answers == ["answer 1", "answer 2"]
+
+
+def test_plain_first_turn_is_served_from_cache(monkeypatch):
+    answers, calls = ask_twice(
+        monkeypatch, "Explain how a binary search tree keeps its keys ordered"
+    )
+
+    assert len(calls) == 1
+    assert not calls[0].search
+    assert answers == ["answer 1", "answer 1"]
@@ -0,0 +1,30 @@
+import asyncio
+
+import main
+from delta.utils.spotify import archive as archive_module
+from delta.utils.spotify.archive import DownloadArchive
+
+
+def test_main_preloads_download_archive(monkeypatch):
+    async def init_db():
+        pass
+
+    async def get_all_archived_urls():
+        return {"https://open.spotify.com/track/a", "https://open.spotify.com/track/b"}
+
+    started = []
+
+    async def start():
+        started.append(True)
+
+    archive = DownloadArchive()
+    monkeypatch.setattr(main, "init_db", init_db)
+    monkeypatch.setattr(main.deltabot, "start", start)
+    monkeypatch.setattr(main.spotify.downloader, "archive", archive)
+    monkeypatch.setattr(archive_module, "get_all_archived_urls", get_all_archived_urls)
+
+    asyncio.run(main.main())
+
+    assert started
+    assert len(archive) == 2
+    assert "https://open.spotify.com/track/a" in archive